@@ -0,0 +1,184 @@
+"""
+Single-pass aggregation of ledger rows: totals per 부서, per 항목 and overall.
+
+Rows are consumed one at a time (or in fixed-size chunks with NumPy), so the work is O(rows)
+and the memory is O(groups) no matter how large the ledger is. Amounts are summed as integer
+minor units (see amount.py), so the totals are exact.
+"""
+
+from operator import itemgetter
+
+from amount import MAX_MINOR, MINOR_PER_UNIT, parse_amount_column, to_minor
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the pure-Python path gives the same results
+    np = None
+
+# Rows buffered per vectorized chunk when NumPy is used (below 2**21, see _grouped_sum)
+NUMPY_CHUNK_ROWS = 65536
+# generate_report switches to the NumPy path from this (estimated) row count when NumPy is installed
+NUMPY_MIN_ROWS = 50000
+
+DEPT_HEADER = "부서"
+ENTRY_HEADER = "항목"
+DEPOSIT_HEADER = "입금"
+WITHDRAWAL_HEADER = "출금"
+
+
+def to_amount(value):
+    """Coerces a cell value to integer minor units for summing. Empty or non-numeric cells count as 0."""
+    if type(value) is int:
+        return value * MINOR_PER_UNIT
+    return to_minor(value)
+
+
+class GroupTotals:
+    """Running count and sums for one group."""
+    __slots__ = ('count', 'deposit', 'withdrawal')
+
+    def __init__(self):
+        self.count = 0
+        self.deposit = 0
+        self.withdrawal = 0
+
+    @property
+    def net(self):
+        return self.deposit - self.withdrawal
+
+
+class LedgerAggregator:
+    """
+    Computes grouped counts/sums and the net balance in one streaming pass.
+
+    Feed rows with add_row() (or add_rows()), then call finish(). Column positions are taken from
+    the header row; if a header is missing, the default 부서/항목/입금/출금 positions are used.
+    """
+
+    def __init__(self, headers, use_numpy=False):
+        headers = [None if header is None else str(header).strip() for header in headers]
+
+        def position(name, default):
+            return headers.index(name) if name in headers else default
+
+        self.dept_index = position(DEPT_HEADER, 0)
+        self.entry_index = position(ENTRY_HEADER, 1)
+        self.deposit_index = position(DEPOSIT_HEADER, len(headers) - 2)
+        self.withdrawal_index = position(WITHDRAWAL_HEADER, len(headers) - 1)
+
+        self.by_dept = {}
+        self.by_entry = {}
+        self.overall = GroupTotals()
+
+        self.use_numpy = bool(use_numpy and np is not None)
+        self._chunk = []
+
+    def _group(self, groups, key):
+        totals = groups.get(key)
+        if totals is None:
+            totals = groups[key] = GroupTotals()
+        return totals
+
+    def add_row(self, row):
+        if self.use_numpy:
+            self._chunk.append(row)
+            if len(self._chunk) >= NUMPY_CHUNK_ROWS:
+                self._flush_chunk()
+            return
+        self._add_row(row)
+
+    def _add_row(self, row):
+        deposit = to_amount(row[self.deposit_index])
+        withdrawal = to_amount(row[self.withdrawal_index])
+        for totals in (self._group(self.by_dept, row[self.dept_index]),
+                       self._group(self.by_entry, row[self.entry_index]),
+                       self.overall):
+            totals.count += 1
+            totals.deposit += deposit
+            totals.withdrawal += withdrawal
+
+    def add_rows(self, rows):
+        for row in rows:
+            self.add_row(row)
+
+    def _flush_chunk(self):
+        """Vectorized group-by of the buffered chunk, merged into the running totals."""
+        chunk = self._chunk
+        self._chunk = []
+        if not chunk:
+            return
+
+        deposits = _amount_array(list(map(itemgetter(self.deposit_index), chunk)))
+        withdrawals = _amount_array(list(map(itemgetter(self.withdrawal_index), chunk)))
+        if deposits is None or withdrawals is None:
+            # Amounts too large for exact int64 sums: Python ints never overflow
+            for row in chunk:
+                self._add_row(row)
+            return
+
+        for groups, key_index in ((self.by_dept, self.dept_index), (self.by_entry, self.entry_index)):
+            keys = list(map(itemgetter(key_index), chunk))
+            # Keys are mapped to codes 0..n-1 (in first-seen order) by hashing; np.unique would have to sort
+            # the objects, which is slower and fails on a mix of text and empty (None) cells
+            distinct = list(dict.fromkeys(keys))
+            code_of = {key: code for code, key in enumerate(distinct)}
+            key_codes = np.fromiter(map(code_of.__getitem__, keys), dtype=np.int64, count=len(keys))
+
+            counts = np.bincount(key_codes, minlength=len(distinct))
+            deposit_sums = _grouped_sum(key_codes, deposits, len(distinct))
+            withdrawal_sums = _grouped_sum(key_codes, withdrawals, len(distinct))
+
+            for key, count, deposit, withdrawal in zip(distinct, counts.tolist(), deposit_sums.tolist(),
+                                                       withdrawal_sums.tolist()):
+                totals = self._group(groups, key)
+                totals.count += count
+                totals.deposit += deposit
+                totals.withdrawal += withdrawal
+
+        self.overall.count += len(chunk)
+        self.overall.deposit += int(deposits.sum())
+        self.overall.withdrawal += int(withdrawals.sum())
+
+    def finish(self):
+        """Flushes any buffered rows. Returns self so the result can be used directly."""
+        if self.use_numpy:
+            self._flush_chunk()
+        return self
+
+
+def _amount_array(values):
+    """
+    to_amount of every cell of one amount column, as an int64 array of minor units. Returns None if the
+    sum of the column could overflow int64.
+    """
+    count = len(values)
+    if set(map(type, values)) <= {int}:
+        # Whole amounts as read from a workbook: no parsing, only a range check before scaling
+        try:
+            units = np.fromiter(values, dtype=np.int64, count=count)
+        except OverflowError:
+            return None
+        if max(int(units.max()), -int(units.min())) > MAX_MINOR // (MINOR_PER_UNIT * count):
+            return None
+        return units * MINOR_PER_UNIT
+
+    minor, errors = parse_amount_column(values)
+    for position in errors:
+        if type(values[position]) is int:
+            return None  # An int beyond the int64 range, which to_amount would still scale
+        minor[position] = 0  # Not an amount: counts as 0, like to_amount
+    amounts = np.fromiter(minor, dtype=np.int64, count=count)
+    if max(int(amounts.max()), -int(amounts.min())) > MAX_MINOR // count:
+        return None
+    return amounts
+
+
+def _grouped_sum(codes, amounts, group_count):
+    """
+    Exact int64 sum of the amounts per code. np.bincount adds float64 weights, which are exact only up
+    to 2**53, so the low and high 32 bits are summed separately (exact for chunks below 2**21 rows) and
+    recombined.
+    """
+    low = np.bincount(codes, weights=amounts & 0xFFFFFFFF, minlength=group_count)
+    high = np.bincount(codes, weights=amounts >> 32, minlength=group_count)
+    return (high.astype(np.int64) << 32) + low.astype(np.int64)
@@ -0,0 +1,283 @@
+"""
+Exact money amounts stored as integer minor units (1/100 of the currency unit).
+
+Everything that enters the ledger goes through parse_amount (one value) or parse_amount_column (a
+whole column at once), which accept what people actually type or paste: thousands separators
+("1,250,000"), currency symbols and codes ("₩3,000", "3,000원", "USD 12.50"), parentheses or a
+trailing minus for negatives ("(1,000)", "1,000-") and up to two decimals ("12.50"). Because the
+result is an int, totals are exact integer sums; format_amount turns minor units back into text.
+"""
+
+import re
+from decimal import Decimal
+
+# The ledger keeps amounts in minor units: 1 unit = 100 minor units
+MINOR_DIGITS = 2
+MINOR_PER_UNIT = 10 ** MINOR_DIGITS
+
+# Range of the signed 64-bit arrays used for the amount columns (in minor units)
+MAX_MINOR = 2**63 - 1
+MIN_MINOR = -2**63
+
+CURRENCY_SYMBOLS = "₩￦$€£¥"
+CURRENCY_WORDS = ("KRW", "USD", "EUR", "JPY", "원")
+MINUS_SIGNS = "-−"
+# Removed before parsing (with the default '.' decimal separator)
+GROUP_SEPARATORS = (",", " ", "\u00a0", "\u202f", "\u2009", "'", "_")
+
+# Characters stripped from both ends of a value in the plain-amount fast path
+_STRIP_CHARS = CURRENCY_SYMBOLS + " \t\u00a0"
+# Values per chunk in parse_amount_column
+BULK_CHUNK_ROWS = 4096
+
+# The common pasted forms ("₩3,000", "-12.50", "(1,000)"; commas already removed), matched in one step
+# by the bulk parser
+_COMMON_AMOUNT = re.compile(r"(\(?)([-+]?)[₩￦$€£¥]?(\d+)(?:\.(\d\d?))?(\)?)")
+
+
+def _strip_currency(text):
+    """Removes currency symbols and codes at either end (repeatedly, e.g. "KRW ₩3,000")."""
+    while True:
+        stripped = text.strip(CURRENCY_SYMBOLS).strip()
+        upper = stripped.upper()
+        for word in CURRENCY_WORDS:
+            if upper.startswith(word):
+                stripped = stripped[len(word):].strip()
+                break
+            if upper.endswith(word):
+                stripped = stripped[:-len(word)].strip()
+                break
+        if stripped == text:
+            return text
+        text = stripped
+
+
+def _parse_text(text, decimal_separator):
+    text = text.strip()
+    negative = False
+    if text.startswith("(") and text.endswith(")"):
+        negative = True
+        text = text[1:-1].strip()
+    text = _strip_currency(text)
+    if text and text[0] in MINUS_SIGNS + "+":
+        negative = negative != (text[0] in MINUS_SIGNS)
+        text = _strip_currency(text[1:])
+    elif text and text[-1] in MINUS_SIGNS:
+        negative = not negative
+        text = _strip_currency(text[:-1])
+
+    if decimal_separator == ".":
+        group_separators = GROUP_SEPARATORS
+    else:
+        # e.g. "1.250.000,50": the dot groups thousands, the comma starts the decimals
+        group_separators = tuple(sep for sep in GROUP_SEPARATORS + (".",) if sep != decimal_separator)
+    for separator in group_separators:
+        if separator in text:
+            text = text.replace(separator, "")
+
+    whole, _, fraction = text.partition(decimal_separator)
+    if not (whole.isdecimal() or (whole == "" and fraction)) or (fraction and not fraction.isdecimal()):
+        raise ValueError("unrecognized format")
+    if len(fraction.rstrip("0")) > MINOR_DIGITS:
+        raise ValueError(f"more than {MINOR_DIGITS} decimal places")
+    minor = int(whole or 0) * MINOR_PER_UNIT + int((fraction + "0" * MINOR_DIGITS)[:MINOR_DIGITS])
+    return -minor if negative else minor
+
+
+def _parse_float(value):
+    if value != value or value in (float("inf"), float("-inf")):
+        raise ValueError("unrecognized format")
+    minor = round(value * MINOR_PER_UNIT)
+    # Spreadsheet floats such as 0.1 + 0.2 are accepted; real sub-cent fractions are not
+    if abs(value * MINOR_PER_UNIT - minor) > 1e-6 * max(1, abs(minor)):
+        raise ValueError(f"more than {MINOR_DIGITS} decimal places")
+    return minor
+
+
+def parse_amount(value, decimal_separator="."):
+    """
+    Converts one cell value (text, int, float, Decimal or Amount) to minor units.
+    None and blank text are 0. Raises ValueError for anything that is not an amount or does not fit.
+    """
+    value_type = type(value)
+    if value_type is str:
+        if value.isdecimal():
+            minor = int(value) * MINOR_PER_UNIT
+        elif not value.strip():
+            return 0
+        else:
+            minor = _parse_text(value, decimal_separator)
+    elif value is None:
+        return 0
+    elif value_type is bool:
+        raise ValueError("unrecognized format")
+    elif isinstance(value, Amount):
+        minor = int(value)  # Already in minor units
+    elif isinstance(value, int):
+        minor = int(value) * MINOR_PER_UNIT
+    elif isinstance(value, float):
+        minor = _parse_float(value)
+    elif isinstance(value, Decimal):
+        if not value.is_finite():
+            raise ValueError("unrecognized format")
+        scaled = value.scaleb(MINOR_DIGITS)
+        if scaled != scaled.to_integral_value():
+            raise ValueError(f"more than {MINOR_DIGITS} decimal places")
+        minor = int(scaled)
+    else:
+        minor = _parse_text(str(value), decimal_separator)
+
+    if not MIN_MINOR <= minor <= MAX_MINOR:
+        raise ValueError("too large")
+    return minor
+
+
+def parse_amount_column(values, decimal_separator="."):
+    """
+    Parses a whole column (a sequence) in one pass, with the same rules as parse_amount.
+    Returns (minor units with None for bad values, {position: error message}).
+
+    The column is handled in chunks. A chunk of plain amounts as text ("1250000", "1,250,000", "₩3,000",
+    "12.50", blanks), by far the most common column, is converted by a single int() comprehension; only
+    chunks where that fails (parentheses, bad values, cells that are not text, ...) are parsed value by value.
+    """
+    parsed = []
+    errors = {}
+    for start in range(0, len(values), BULK_CHUNK_ROWS):
+        chunk = values[start:start + BULK_CHUNK_ROWS]
+        if decimal_separator == ".":
+            minor = _parse_plain_chunk(chunk)
+            if minor is not None:
+                parsed.extend(minor)
+                continue
+        _parse_chunk_values(chunk, start, parsed, errors, decimal_separator)
+    return parsed, errors
+
+
+def _parse_plain_chunk(chunk):
+    """
+    Minor units of a chunk of plain amounts as text ("1250000", "1,250,000", "₩3,000", "12.50", "12.5",
+    blanks), or None if any value has another form or is not text.
+    """
+    try:
+        joined = "\n".join(chunk)
+    except TypeError:
+        return None  # Not all text (e.g. ints and floats read from a workbook)
+    if "," in joined:
+        joined = joined.replace(",", "")
+    texts = joined.split("\n")
+    if len(texts) != len(chunk):
+        return None  # A value contained a line break
+    stripped = [text.strip(_STRIP_CHARS) for text in texts]
+    if stripped.count("") != texts.count(""):
+        return None  # A value of only currency symbols or spaces
+    scale = MINOR_PER_UNIT
+    try:
+        # The decimal point is cut out so int() reads the minor units directly ("12.50" -> "1250");
+        # int() also takes a sign. That is only done when the whole part is an optional sign and digits
+        # and the decimals are digits, so ".-5" is not read as -5. Values with any other shape become None.
+        minor = [int(text or 0) * scale if "." not in text
+                 else int(text[:-3] + text[-2:])
+                 if text[-3:-2] == "." and text[-2:].isdecimal() and (text[:-3].lstrip("+-") or "0").isdecimal()
+                 else int(text[:-2] + text[-1:] + "0")
+                 if text[-2:-1] == "." and text[-1:].isdecimal() and (text[:-2].lstrip("+-") or "0").isdecimal()
+                 else None
+                 for text in stripped]
+    except ValueError:
+        return None
+    if None in minor or (minor and (max(minor) > MAX_MINOR or min(minor) < MIN_MINOR)):
+        return None
+    return minor
+
+
+def _parse_chunk_values(chunk, offset, parsed, errors, decimal_separator):
+    """Value-by-value path of parse_amount_column; the common formatted forms still avoid the general parser."""
+    append = parsed.append
+    scale = MINOR_PER_UNIT
+    max_units = MAX_MINOR // scale
+    min_units = -(-MIN_MINOR // scale)
+    match_common = _COMMON_AMOUNT.fullmatch if decimal_separator == "." else (lambda value: None)
+    for position, value in enumerate(chunk, start=offset):
+        value_type = type(value)
+        if value_type is str:
+            text = value.replace(",", "") if "," in value else value
+            if text.isdecimal() and len(text) < 17:
+                append(int(text) * scale)
+                continue
+            match = match_common(text)
+            if match is not None:
+                open_paren, sign, whole, fraction, close_paren = match.groups()
+                if len(open_paren) == len(close_paren) and len(whole) < 17:
+                    minor = int(whole) * scale
+                    if fraction:
+                        minor += int(fraction) * (10 if len(fraction) == 1 else 1)
+                    if (sign == "-") != bool(open_paren):
+                        minor = -minor
+                    append(minor)
+                    continue
+        elif value_type is int and min_units <= value <= max_units:
+            append(value * scale)
+            continue
+        try:
+            append(parse_amount(value, decimal_separator))
+        except ValueError as e:
+            append(None)
+            errors[position] = str(e)
+
+
+def to_minor(value):
+    """Lenient conversion for summing cells read from a workbook: anything that is not an amount counts as 0."""
+    try:
+        return parse_amount(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def format_amount(minor, grouping=False):
+    """
+    Minor units as text: whole amounts without decimals ("1250"), others with two ("12.50").
+    grouping adds thousands separators ("1,250,000").
+    """
+    units, cents = divmod(abs(minor), MINOR_PER_UNIT)
+    sign = "-" if minor < 0 else ""
+    whole = f"{units:,}" if grouping else str(units)
+    if cents:
+        return f"{sign}{whole}.{cents:0{MINOR_DIGITS}d}"
+    return f"{sign}{whole}"
+
+
+def to_cell_value(minor):
+    """Value written to a workbook cell: an int for whole amounts, otherwise an exact Decimal."""
+    units, cents = divmod(minor, MINOR_PER_UNIT)
+    if not cents:
+        return units
+    return Decimal(minor).scaleb(-MINOR_DIGITS)
+
+
+class Amount(int):
+    """
+    An amount in minor units. It is an int, so sums and comparisons stay exact integer operations;
+    str() gives the plain unit text used in the preview and the cell editor ("1250", "12.50").
+    """
+    __slots__ = ()
+
+    @classmethod
+    def parse(cls, value, decimal_separator="."):
+        return cls(parse_amount(value, decimal_separator))
+
+    @property
+    def minor(self):
+        return int(self)
+
+    @property
+    def units(self):
+        return to_cell_value(int(self))
+
+    def __str__(self):
+        return format_amount(int(self))
+
+    def __repr__(self):
+        return f"Amount('{self}')"
+
+    def __format__(self, format_spec):
+        return format(str(self), format_spec)
@@ -0,0 +1,178 @@
+"""
+Headless batch conversion of Excel ledgers to Word reports.
+
+Usage:
+    python main.py report [--jobs N] [--force-rebuild | --no-cache] <dir|file|glob> [...]
+    python batch_report.py [--jobs N] [--force-rebuild | --no-cache] <dir|file|glob> [...]
+    python main.py report --split-by-dept [--jobs N] <dir|file|glob> [...]
+
+Unchanged workbooks are served from the report cache (see report_cache.py) unless --force-rebuild is given.
+--rows-per-part N splits each report into part files of at most N rows with a summary-only master.
+--split-by-dept writes one report per 부서 for each workbook instead (see department_reports.py).
+--template DOCX builds the reports from a .docx template with company styles (see report_template.py).
+
+This module must not import tkinter, so it can run on machines without a display.
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+def find_ledgers(targets):
+    """Expands directories, .xlsx paths and glob patterns into a sorted list of ledger files."""
+    found = set()
+    for target in targets:
+        if os.path.isdir(target):
+            candidates = glob.glob(os.path.join(target, "*.xlsx"))
+        else:
+            candidates = glob.glob(target) or [target]
+
+        for path in candidates:
+            name = os.path.basename(path)
+            # Skip Excel lock files ("~$name.xlsx") and anything that is not a workbook
+            if name.startswith("~$") or not name.lower().endswith(".xlsx"):
+                continue
+            found.add(os.path.abspath(path))
+    return sorted(found)
+
+
+def generate_one(excel_file_path, cache_dir=None, force_rebuild=False, rows_per_part=None, template_path=None):
+    """
+    Generates one report. Runs inside a worker process, so all failures are returned, not raised.
+    cache_dir=None disables the report cache; rows_per_part splits the report into part files.
+    template_path is a .docx report template (parsed once per worker process, see report_template.py).
+    Returns a dict with path, doc_path, seconds, error, cache_hit and phases (span name -> seconds).
+    """
+    # Imported here so the parent process only pays for openpyxl/python-docx if it runs jobs itself
+    from instrumentation import Instrumentation
+    from report_cache import ReportCache
+    from report_template import get_report_template
+    from word_report import WordReportGenerator
+
+    result = {"path": excel_file_path, "doc_path": None, "seconds": 0.0, "error": None,
+              "cache_hit": False, "phases": {}}
+    instrumentation = Instrumentation(lambda span: result["phases"].update({span.name: span.seconds}))
+
+    start = time.perf_counter()
+    try:
+        cache = ReportCache(cache_dir) if cache_dir else None
+        report_maker = WordReportGenerator(cache, instrumentation, get_report_template(template_path))
+        result["doc_path"] = report_maker.generate_report(excel_file_path, force_rebuild=force_rebuild,
+                                                         rows_per_part=rows_per_part)
+        result["cache_hit"] = bool(cache and cache.hits)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def run_batch(paths, jobs, cache_dir=None, force_rebuild=False, rows_per_part=None, template_path=None):
+    """Generates all reports, yielding each result as soon as it is ready."""
+    options = (cache_dir, force_rebuild, rows_per_part, template_path)
+    if jobs <= 1 or len(paths) <= 1:
+        for path in paths:
+            yield generate_one(path, *options)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+        futures = [pool.submit(generate_one, path, *options) for path in paths]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="main.py report",
+        description="Convert Excel ledgers (.xlsx) to Word reports in parallel."
+    )
+    parser.add_argument("targets", nargs="+", help="directories, .xlsx files or glob patterns")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes (default: number of CPUs)")
+    parser.add_argument("--force-rebuild", action="store_true",
+                        help="regenerate every report even if the workbook is unchanged")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the report cache")
+    parser.add_argument("--cache-dir", default=None,
+                        help="report cache directory (default: ~/.financial_program/report_cache)")
+    parser.add_argument("--phases", action="store_true",
+                        help="print the time spent in each phase (load, row_iteration, table_build, save, ...)")
+    parser.add_argument("--rows-per-part", type=int, default=None, metavar="N",
+                        help="write the detail rows to part files of at most N rows each, "
+                             "linked from a summary-only <name>_Report.docx (never cached)")
+    parser.add_argument("--template", default=None, metavar="DOCX",
+                        help="report template with company styles ({{title}}, {{date}}, {{table}} placeholders)")
+    parser.add_argument("--split-by-dept", action="store_true",
+                        help="write one report per 부서 (plus an index.csv) for each workbook")
+    args = parser.parse_args(argv)
+
+    cache_dir = None
+    if not args.no_cache:
+        from report_cache import DEFAULT_CACHE_DIR
+        cache_dir = args.cache_dir or DEFAULT_CACHE_DIR
+
+    paths = find_ledgers(args.targets)
+    if not paths:
+        print("No .xlsx files found.", file=sys.stderr)
+        return 2
+
+    if args.split_by_dept:
+        return split_main(paths, args.jobs, args.template)
+
+    print(f"Generating {len(paths)} report(s) with {max(1, min(args.jobs, len(paths)))} job(s)...")
+
+    failures = 0
+    cache_hits = 0
+    batch_start = time.perf_counter()
+    for result in run_batch(paths, args.jobs, cache_dir, args.force_rebuild, args.rows_per_part,
+                            args.template):
+        if result["error"] is None:
+            cache_hits += result["cache_hit"]
+            status = "CACHE" if result["cache_hit"] else "OK"
+            print(f"{status:<5} {result['seconds']:8.2f}s  {result['path']} -> {os.path.basename(result['doc_path'])}")
+        else:
+            failures += 1
+            print(f"FAIL  {result['seconds']:8.2f}s  {result['path']}: {result['error']}")
+
+        if args.phases and result["phases"]:
+            print("      " + ", ".join(f"{name} {seconds:.3f}s" for name, seconds in result["phases"].items()))
+
+    total_elapsed = time.perf_counter() - batch_start
+    print(f"Done: {len(paths) - failures} succeeded, {failures} failed in {total_elapsed:.2f}s.")
+    if cache_dir:
+        print(f"Report cache: {cache_hits} hit(s), {len(paths) - failures - cache_hits} miss(es).")
+    return 1 if failures else 0
+
+
+def split_main(paths, jobs, template_path=None):
+    """--split-by-dept: the workbooks are split one after another, each across the process pool."""
+    from department_reports import split_report
+
+    failures = 0
+    batch_start = time.perf_counter()
+    for path in paths:
+        start = time.perf_counter()
+        try:
+            index_path, results = split_report(path, jobs, template_path=template_path)
+        except Exception as e:
+            failures += 1
+            print(f"FAIL  {time.perf_counter() - start:8.2f}s  {path}: {type(e).__name__}: {e}")
+            continue
+
+        failed = [result for result in results if result["error"]]
+        failures += bool(failed)
+        status = "FAIL" if failed else "OK"
+        print(f"{status:<5} {time.perf_counter() - start:8.2f}s  {path} -> "
+              f"{len(results) - len(failed)} department report(s), index {index_path}")
+        for result in failed:
+            print(f"      {result['department']}: {result['error']}")
+
+    total_elapsed = time.perf_counter() - batch_start
+    print(f"Done: {len(paths) - failures} succeeded, {failures} failed in {total_elapsed:.2f}s.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
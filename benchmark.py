@@ -0,0 +1,312 @@
+"""
+Benchmark suite for the hot paths, using synthetic Korean-labelled ledgers (DATA_HEADERS schema).
+
+Usage:
+    python benchmark.py [--sizes 1000 10000 100000 1000000] [--only NAME ...] [--no-memory]
+                        [--output results.json] [--compare previous.json]
+    python benchmark.py --startup [--repeat 5]
+
+Each case is timed once without tracing, then (unless --no-memory) run again under tracemalloc to
+record the peak Python memory, because tracing slows the code down too much to time it at the same time.
+Results are written as JSON so runs from different commits can be compared with --compare.
+
+--startup compares the import time of main.py as it starts now (openpyxl and python-docx deferred)
+with importing the heavy modules eagerly, using the interpreter's own -X importtime report.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from amount import parse_amount_column
+from excel_generator import ExcelGenerator
+from instrumentation import Instrumentation
+from word_report import WordReportGenerator
+
+# Same schema as main.DATA_HEADERS (main.py is not imported so the suite runs without a display)
+DATA_HEADERS = ("부서", "항목", "입금", "출금")
+
+DEPARTMENTS = ("총무부", "영업부", "인사부", "개발부", "재무부", "마케팅부", "구매부", "법무부")
+ENTRIES = ("식비", "교통비", "급여", "비품", "출장비", "회의비", "임대료", "통신비")
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+MAX_CELL_EDITS = 10000
+
+
+def make_synthetic_rows(row_count, seed=0):
+    """Yields deterministic rows of (부서, 항목, 입금, 출금) with amounts as strings, like GUI input."""
+    rng = random.Random(seed)
+    for _ in range(row_count):
+        if rng.random() < 0.5:
+            deposit, withdrawal = rng.randrange(1, 5_000_000), 0
+        else:
+            deposit, withdrawal = 0, rng.randrange(1, 2_000_000)
+        yield rng.choice(DEPARTMENTS), rng.choice(ENTRIES), str(deposit), str(withdrawal)
+
+
+def build_generator(row_count):
+    """Returns an ExcelGenerator filled with row_count synthetic rows (bulk path, not timed)."""
+    generator = ExcelGenerator(DATA_HEADERS)
+    rows = list(make_synthetic_rows(row_count))
+    added, errors = generator.import_rows(rows, list(range(2, row_count + 2)))
+    assert added == row_count and not errors
+    return generator
+
+
+class SkipBenchmark(Exception):
+    """Raised by a case that cannot run in this environment."""
+
+
+# --- Benchmark cases ---
+# Each case is setup(row_count, work_dir) -> run() closure, so only run() is measured.
+
+def case_add_data_row(row_count, work_dir):
+    rows = list(make_synthetic_rows(row_count))
+
+    def run():
+        generator = ExcelGenerator(DATA_HEADERS)
+        for row in rows:
+            generator.add_data_row(*row)
+    return run
+
+
+def case_update_data_cell(row_count, work_dir):
+    generator = build_generator(row_count)
+    rng = random.Random(1)
+    edits = [(rng.randrange(1, row_count + 1), rng.choice(DATA_HEADERS), rng.randrange(10_000))
+             for _ in range(min(row_count, MAX_CELL_EDITS))]
+
+    def run():
+        for user_row_index, col_name, value in edits:
+            generator.update_data_cell(user_row_index, col_name, str(value))
+    return run
+
+
+def case_parse_amount_column(row_count, work_dir):
+    """One pasted amount column of mixed text: plain digits, thousands separators, currency symbols, cents, blanks."""
+    rng = random.Random(2)
+    formats = (str, "{:,}".format, "₩{:,}".format, "{:,}.50".format, lambda amount: "")
+    values = [rng.choice(formats)(rng.randrange(1, 5_000_000)) for _ in range(row_count)]
+
+    def run():
+        parsed, errors = parse_amount_column(values)
+        if errors:
+            raise RuntimeError(f"{len(errors)} values were rejected")
+    return run
+
+
+def case_snapshot(row_count, work_dir):
+    """Copying the ledger for a background save; this part runs on the Tk thread."""
+    generator = build_generator(row_count)
+
+    def run():
+        generator.snapshot()
+    return run
+
+
+def _case_save_file(streaming):
+    def case(row_count, work_dir):
+        generator = build_generator(row_count)
+        file_path = os.path.join(work_dir, f"save_{row_count}.xlsx")
+
+        def run():
+            generator.save_file(file_path, streaming=streaming)
+        return run
+    return case
+
+
+def case_generate_report(row_count, work_dir):
+    excel_file_path = os.path.join(work_dir, f"report_{row_count}.xlsx")
+    build_generator(row_count).save_file(excel_file_path)
+
+    phases = {}
+    instrumentation = Instrumentation(lambda span: phases.update({span.name: span.seconds}))
+
+    def run():
+        WordReportGenerator(instrumentation=instrumentation).generate_report(excel_file_path)
+    # Per-phase seconds from the report spans are saved with the result
+    run.details = {"phases": phases}
+    return run
+
+
+def case_update_treeview_preview(row_count, work_dir):
+    """Drives the real preview refresh on a withdrawn window. Needs a display; skipped otherwise."""
+    import tkinter as tk
+    from main import MainApplication
+
+    try:
+        # A scratch journal, so the user's unsaved session is neither offered nor overwritten
+        app = MainApplication(journal_path=os.path.join(work_dir, "preview.journal"))
+    except tk.TclError as e:
+        raise SkipBenchmark(f"no display ({e})")
+    app.withdraw()
+    app.open_excel_window(recover=False)
+    app.excel_toplevel_window.withdraw()
+    app.current_excel_generator = build_generator(row_count)
+
+    def run():
+        app.update_treeview_preview()
+        app.update_idletasks()
+    run.cleanup = app.destroy
+    return run
+
+
+BENCHMARKS = {
+    "add_data_row": case_add_data_row,
+    "update_data_cell": case_update_data_cell,
+    "parse_amount_column": case_parse_amount_column,
+    "snapshot": case_snapshot,
+    "save_file[streaming]": _case_save_file(streaming=True),
+    "save_file[edit-mode]": _case_save_file(streaming=False),
+    "generate_report": case_generate_report,
+    "update_treeview_preview": case_update_treeview_preview,
+}
+
+
+# --- Startup time ---
+
+STARTUP_SCENARIOS = {
+    "lazy (import main)": "import main",
+    "eager (main + excel_generator + word_report)": "import main, excel_generator, word_report",
+}
+
+
+def import_time_seconds(statement):
+    """Runs statement in a fresh interpreter with -X importtime; returns the summed top-level cumulative time."""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], capture_output=True,
+                               text=True, cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+    total_us = 0
+    for line in completed.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"; top-level imports are not indented
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if name.startswith(" ") and not name.startswith("  ") and cumulative.strip().isdigit():
+            total_us += int(cumulative)
+    return total_us / 1e6
+
+
+def measure_startup(repeat):
+    """Prints the median import time of each STARTUP_SCENARIOS entry."""
+    for label, statement in STARTUP_SCENARIOS.items():
+        try:
+            timings = sorted(import_time_seconds(statement) for _ in range(repeat))
+        except subprocess.CalledProcessError as e:
+            # main.py prints its import errors to stdout; stderr only holds the importtime report
+            print(f"{label:<46} error: {e.stdout.strip() or e}")
+            continue
+        print(f"{label:<46} {timings[len(timings) // 2]:8.3f}s (median of {repeat})")
+
+
+def run_once(case, row_count, work_dir, traced):
+    """Sets up and runs one case. Returns (seconds, tracemalloc peak bytes or None, extra details)."""
+    run = case(row_count, work_dir)
+    try:
+        if traced:
+            tracemalloc.start()
+        start = time.perf_counter()
+        run()
+        seconds = time.perf_counter() - start
+        peak_bytes = tracemalloc.get_traced_memory()[1] if traced else None
+        return seconds, peak_bytes, getattr(run, "details", {})
+    finally:
+        if traced:
+            tracemalloc.stop()
+        if hasattr(run, "cleanup"):
+            run.cleanup()
+
+
+def measure(case, row_count, work_dir, with_memory):
+    """Returns a result dict with wall time and (optionally) tracemalloc peak bytes."""
+    result = {"rows": row_count, "seconds": None, "peak_bytes": None, "status": "ok"}
+    try:
+        result["seconds"], _, details = run_once(case, row_count, work_dir, traced=False)
+        result.update(details)
+        if with_memory:
+            _, result["peak_bytes"], _ = run_once(case, row_count, work_dir, traced=True)
+    except SkipBenchmark as e:
+        result["status"] = f"skipped: {e}"
+    except Exception as e:
+        result["status"] = f"error: {type(e).__name__}: {e}"
+    return result
+
+
+def current_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous_path):
+    """Prints the time ratio (current / previous) for every case present in both runs."""
+    with open(previous_path, encoding="utf-8") as previous_file:
+        previous = json.load(previous_file)
+    old = {(item["name"], item["rows"]): item for item in previous["results"]}
+
+    print(f"\nCompared with {previous_path} (commit {previous.get('commit')}):")
+    for item in results:
+        before = old.get((item["name"], item["rows"]))
+        if not before or not before["seconds"] or item["seconds"] is None:
+            continue
+        ratio = item["seconds"] / before["seconds"]
+        flag = "  REGRESSION" if ratio > 1.2 else ""
+        print(f"  {item['name']:<26} {item['rows']:>9,} rows  {ratio:6.2f}x{flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the ledger and report hot paths.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="ledger sizes in rows (default: 1000 10000 100000; up to 1000000)")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="run only these cases")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory pass")
+    parser.add_argument("--output", default="benchmark_results.json", help="where to write the JSON results")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    parser.add_argument("--startup", action="store_true",
+                        help="only compare the startup import time with lazy vs eager heavy imports")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per startup scenario (default: 5)")
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        measure_startup(args.repeat)
+        return 0
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="ledger-bench-") as work_dir:
+        for name in args.only or BENCHMARKS:
+            for row_count in args.sizes:
+                result = measure(BENCHMARKS[name], row_count, work_dir, not args.no_memory)
+                result["name"] = name
+                results.append(result)
+
+                seconds = "-" if result["seconds"] is None else f"{result['seconds']:.3f}s"
+                peak = "-" if result["peak_bytes"] is None else f"{result['peak_bytes'] / 2**20:.1f} MiB"
+                print(f"{name:<26} {row_count:>9,} rows  {seconds:>10}  {peak:>11}  {result['status']}")
+
+    report = {
+        "commit": current_commit(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as output_file:
+        json.dump(report, output_file, ensure_ascii=False, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""
+Per-department report splitting: one Word report per 부서 instead of one report for the whole workbook.
+
+The workbook is read once, streaming; every row is appended to its department's partition file in a
+temporary directory, so memory stays bounded by the write buffers rather than the ledger size. The
+partitions are then turned into reports on a process pool, largest department first, so the total
+wall time is bounded by the largest department (plus the partitioning pass) rather than the sum of all
+of them. An index (CSV) of the generated files is written next to the reports.
+
+This module must not import tkinter, so it can run on machines without a display.
+"""
+
+import csv
+import os
+import pickle
+import re
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from aggregation import DEPT_HEADER
+from file_utils import atomic_save
+
+# Rows buffered per department before they are appended to its partition file
+PARTITION_BATCH_ROWS = 2000
+
+INDEX_FILE_NAME = "index.csv"
+BLANK_DEPARTMENT = "(blank)"
+
+# Characters that are not allowed in file names on Windows/macOS
+_UNSAFE_NAME_CHARS = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+
+
+def department_file_name(base_stem, department, used_names):
+    """File name of a department's report; names that collide after cleaning get a numeric suffix."""
+    cleaned = _UNSAFE_NAME_CHARS.sub("_", department).strip(" .") or "_"
+    name = f"{base_stem}_Report_{cleaned}.docx"
+    suffix = 2
+    while name.lower() in used_names:
+        name = f"{base_stem}_Report_{cleaned}_{suffix}.docx"
+        suffix += 1
+    used_names.add(name.lower())
+    return name
+
+
+def _department_key(value):
+    if value is None or str(value).strip() == "":
+        return BLANK_DEPARTMENT
+    return str(value).strip()
+
+
+def partition_rows(headers, data_rows, work_dir):
+    """
+    Streams the rows into one pickle file per department (a sequence of row batches).
+    Returns {department: (partition file path, row count)}.
+    """
+    normalized = [None if header is None else str(header).strip() for header in headers]
+    dept_index = normalized.index(DEPT_HEADER) if DEPT_HEADER in normalized else 0
+
+    partitions = {}
+    buffers = {}
+
+    def flush(department):
+        path, count = partitions[department]
+        with open(path, "ab") as partition_file:
+            pickle.dump(buffers[department], partition_file, protocol=pickle.HIGHEST_PROTOCOL)
+        partitions[department] = (path, count + len(buffers[department]))
+        buffers[department] = []
+
+    for row in data_rows:
+        department = _department_key(row[dept_index])
+        buffer = buffers.get(department)
+        if buffer is None:
+            partitions[department] = (os.path.join(work_dir, f"part{len(partitions)}.pickle"), 0)
+            buffer = buffers[department] = []
+        buffer.append(tuple(row))
+        if len(buffer) >= PARTITION_BATCH_ROWS:
+            flush(department)
+
+    for department, buffer in buffers.items():
+        if buffer:
+            flush(department)
+    return partitions
+
+
+def _read_partition(partition_path):
+    with open(partition_path, "rb") as partition_file:
+        while True:
+            try:
+                batch = pickle.load(partition_file)
+            except EOFError:
+                return
+            yield from batch
+
+
+def build_department_report(source_name, department, headers, partition_path, row_count, doc_path,
+                            include_summary=True, template_path=None):
+    """
+    Builds one department's report from its partition file. Runs inside a worker process,
+    so failures are returned, not raised. Returns a dict with department, rows, doc_path and error.
+    """
+    # Imported here so only the processes that build documents load python-docx
+    from report_template import get_report_template
+    from word_report import WordReportGenerator
+
+    result = {"department": department, "rows": row_count, "doc_path": doc_path, "error": None}
+    try:
+        # The template is parsed once per worker process and cloned for each department it builds
+        WordReportGenerator(template=get_report_template(template_path)).generate_report_from_rows(
+            f"{source_name} ({department})", doc_path, headers, _read_partition(partition_path),
+            row_count, include_summary)
+    except Exception as e:
+        result["doc_path"] = None
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def write_index(index_path, results):
+    """Writes the index of the generated files (UTF-8 with BOM, so Excel shows the Korean names)."""
+
+    def write_csv(temp_path):
+        with open(temp_path, "w", newline="", encoding="utf-8-sig") as index_file:
+            writer = csv.writer(index_file)
+            writer.writerow([DEPT_HEADER, "Rows", "Report", "Error"])
+            for result in sorted(results, key=lambda result: result["department"]):
+                report = os.path.basename(result["doc_path"]) if result["doc_path"] else ""
+                writer.writerow([result["department"], result["rows"], report, result["error"] or ""])
+
+    atomic_save(index_path, write_csv)
+
+
+def split_report(excel_file_path, jobs=None, output_dir=None, include_summary=True, template_path=None):
+    """
+    Generates one report per department of the workbook.
+    The reports and index.csv go to output_dir (default: "<name>_Department_Reports" next to the workbook).
+    jobs is the number of worker processes (default: number of CPUs); jobs <= 1 builds in this process.
+    template_path is an optional .docx report template (see report_template.py).
+    Returns (index path, list of per-department result dicts, largest department first).
+    """
+    from word_report import WordReportGenerator
+
+    if not os.path.exists(excel_file_path):
+        raise FileNotFoundError(f"File not found: {excel_file_path}")
+
+    base_name = os.path.basename(excel_file_path)
+    base_stem = os.path.splitext(base_name)[0]
+    if output_dir is None:
+        output_dir = os.path.join(os.path.dirname(excel_file_path), f"{base_stem}_Department_Reports")
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = jobs or os.cpu_count() or 1
+
+    headers, data_rows, _ = WordReportGenerator().open_excel_rows(excel_file_path)
+    work_dir = tempfile.mkdtemp(prefix=".partitions_", dir=output_dir)
+    try:
+        try:
+            partitions = partition_rows(headers, data_rows, work_dir)
+        finally:
+            data_rows.close()
+
+        # Largest first: the longest job starts right away instead of being left for the end
+        used_names = set()
+        tasks = []
+        for department, (partition_path, row_count) in sorted(
+                partitions.items(), key=lambda item: (-item[1][1], item[0])):
+            doc_path = os.path.join(output_dir, department_file_name(base_stem, department, used_names))
+            tasks.append((base_name, department, headers, partition_path, row_count, doc_path, include_summary,
+                          template_path))
+
+        if jobs <= 1 or len(tasks) <= 1:
+            results = [build_department_report(*task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+                futures = [pool.submit(build_department_report, *task) for task in tasks]
+                finished = {}
+                for future in as_completed(futures):
+                    result = future.result()
+                    finished[result["department"]] = result
+            results = [finished[task[1]] for task in tasks]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    index_path = os.path.join(output_dir, INDEX_FILE_NAME)
+    write_index(index_path, results)
+    return index_path, results
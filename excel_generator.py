@@ -45,41 +45,283 @@ class ExcelGenerator:
 
 
 import openpyxl
+import csv
+import io
 import os
 
+from amount import Amount, format_amount, parse_amount, parse_amount_column, to_cell_value
+from file_utils import atomic_save
+from ledger import Ledger
+from search_index import LedgerSearchIndex
+
+# Rows per chunk when an existing workbook is loaded (see iter_xlsx_row_chunks)
+LOAD_CHUNK_ROWS = 5000
+
+# How often (in rows) save progress is reported
+SAVE_PROGRESS_ROWS = 5000
+
+
+def check_header(header, expected_headers):
+    """Raises ValueError unless the file's header row matches the expected headers."""
+    found = tuple("" if value is None else str(value).strip() for value in header)
+    if found != tuple(expected_headers):
+        raise ValueError(f"Unexpected header row {found}; expected {tuple(expected_headers)}.")
+
+
+def _is_blank_row(row):
+    return all(value is None or str(value).strip() == "" for value in row)
+
+
+def read_csv_rows(file_path):
+    """
+    Reads a CSV file. Returns (header row, data rows, line number of each data row).
+    Blank lines are skipped. UTF-8 (with or without BOM) is tried first, then cp949 (Korean Excel).
+    """
+    for encoding in ('utf-8-sig', 'cp949'):
+        try:
+            with open(file_path, newline='', encoding=encoding) as csv_file:
+                all_rows = list(csv.reader(csv_file))
+            break
+        except UnicodeDecodeError:
+            continue
+    else:
+        raise ValueError("The CSV file is not UTF-8 or cp949 encoded.")
+
+    if not all_rows:
+        raise ValueError("The CSV file is empty.")
+
+    # csv.reader yields one row per record; line numbers are 1-based like in a spreadsheet
+    rows = []
+    line_numbers = []
+    for line_number, row in enumerate(all_rows[1:], start=2):
+        if not _is_blank_row(row):
+            rows.append([value.strip() for value in row])
+            line_numbers.append(line_number)
+    return all_rows[0], rows, line_numbers
+
+
+def read_pasted_rows(text):
+    """
+    Parses a tab/newline separated block copied from a spreadsheet or bank statement.
+    Returns (data rows, line number of each row); blank lines are skipped. Cells that Excel quoted
+    (e.g. because they contain a line break) are unquoted like in a CSV file.
+    """
+    rows = []
+    line_numbers = []
+    reader = csv.reader(io.StringIO(text), delimiter='\t')
+    for line_number, row in enumerate(reader, start=1):
+        if not _is_blank_row(row):
+            rows.append([value.strip() for value in row])
+            line_numbers.append(line_number)
+    return rows, line_numbers
+
+
+def read_xlsx_rows(file_path):
+    """Reads the active sheet of a .xlsx file in read-only mode. Same return value as read_csv_rows."""
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        all_rows = workbook.active.iter_rows(values_only=True)
+        header = next(all_rows, None)
+        if header is None:
+            raise ValueError("The Excel file is empty.")
+
+        rows = []
+        line_numbers = []
+        for line_number, row in enumerate(all_rows, start=2):
+            if not _is_blank_row(row):
+                rows.append(row)
+                line_numbers.append(line_number)
+        return header, rows, line_numbers
+    finally:
+        workbook.close()
+
+def iter_xlsx_row_chunks(file_path, expected_headers, chunk_rows=LOAD_CHUNK_ROWS):
+    """
+    Reads the active sheet of a .xlsx file in read-only mode, chunk by chunk.
+    The header row is checked first (ValueError if it does not match); then (rows, line numbers)
+    pairs of up to chunk_rows non-blank data rows are yielded. The workbook is closed when the
+    generator is exhausted or closed.
+    """
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        all_rows = workbook.active.iter_rows(values_only=True)
+        header = next(all_rows, None)
+        if header is None:
+            raise ValueError("The Excel file is empty.")
+        check_header(header, expected_headers)
+
+        rows = []
+        line_numbers = []
+        for line_number, row in enumerate(all_rows, start=2):
+            if not _is_blank_row(row):
+                rows.append(row)
+                line_numbers.append(line_number)
+                if len(rows) >= chunk_rows:
+                    yield rows, line_numbers
+                    rows = []
+                    line_numbers = []
+        if rows:
+            yield rows, line_numbers
+    finally:
+        workbook.close()
+
+class SaveSnapshot:
+    """
+    The rows as they were when a save started (see ExcelGenerator.snapshot), so the workbook can be
+    written on a worker thread while editing goes on.
+    """
+    __slots__ = ('ledger', 'edit_count', 'journal_mark')
+
+    def __init__(self, ledger, edit_count, journal_mark):
+        self.ledger = ledger
+        self.edit_count = edit_count
+        # Where the journal ended when the snapshot was taken (None without a journal)
+        self.journal_mark = journal_mark
+
+
 class ExcelGenerator:
     """
     Handles the creation, writing, and updating of data in an Excel file (.xlsx).
     The methods are designed to be called by the GUI logic.
+
+    Rows are kept in a compact columnar Ledger; the openpyxl workbook is only built when saving (write_file).
+    Amounts are stored as integer minor units (see amount.py) and returned as Amount values.
     """
     
     def __init__(self, header_list): 
-        # Initialize workbook and set headers based on the list passed from main.py
-        self.workbook = openpyxl.Workbook()
-        self.sheet = self.workbook.active
-        self.sheet.title = "Data Entry"
-        
+        # Headers are based on the list passed from main.py
         self.headers = header_list 
-        
-        # Write headers to the first row
-        for col_idx, header in enumerate(self.headers, start=1):
-            self.sheet.cell(row=1, column=col_idx, value=header)
+        self.ledger = Ledger(header_list)
+        # Precomputed header -> 0-based column index map (O(1) column lookup)
+        self.column_index = {name: index for index, name in enumerate(self.headers)}
+        self.amount_headers = frozenset(self.headers[-2:]) # 입금, 출금
+        # Kept up to date on every add and edit, for the preview filter
+        self.search_index = LedgerSearchIndex(self.ledger)
+        # Optional journal.EditJournal; every edit is appended to it for crash recovery
+        self.journal = None
+        # The workbook the rows were loaded from (None for a new ledger); saving writes back to it
+        self.source_path = None
+        # Incremented by every change, so a finished background save can tell whether edits came in meanwhile
+        self.edit_count = 0
+
+    def attach_journal(self, journal, keep_existing=False):
+        """Starts recording edits to the journal (keep_existing continues a replayed journal)."""
+        journal.start(self.headers, keep_existing=keep_existing, source_path=self.source_path)
+        self.journal = journal
+
+    def load_rows(self, rows, line_numbers):
+        """
+        Adds rows read from the source workbook (one chunk of iter_xlsx_row_chunks).
+        They are not journaled: recovery reloads the source file instead.
+        Returns (number of rows added, list of error messages), like import_rows.
+        """
+        return self.import_rows(rows, line_numbers, record=False)
+
+    def load_file(self, file_path):
+        """Loads an existing workbook in one go (used by journal replay) and makes it the source file."""
+        added = 0
+        errors = []
+        for rows, line_numbers in iter_xlsx_row_chunks(file_path, self.headers):
+            chunk_added, chunk_errors = self.load_rows(rows, line_numbers)
+            added += chunk_added
+            errors.extend(chunk_errors)
+        self.source_path = file_path
+        return added, errors
 
     def _validate_numeric(self, value, column_name):
-        """Helper to validate and coerce numeric data types (handling empty strings as 0)."""
-        if value is None or str(value).strip() == "":
-            return 0
+        """
+        Helper to validate an amount ("1,250,000", "₩3,000", "12.50", "(500)", ...; empty is 0).
+        Returns it in integer minor units.
+        """
         try:
-            # Using int() for typical accounting/whole dollar values. Use float() if cents are required.
-            return int(value) 
-        except ValueError:
-            raise ValueError(f"'{column_name}' must be a valid whole number.")
+            return parse_amount(value)
+        except ValueError as e:
+            raise ValueError(f"'{column_name}' must be a valid amount ({e}).")
+
+    def _parse_numeric_column(self, values, column_name):
+        """
+        Validates a whole amount column in one pass (same rules as _validate_numeric).
+        Returns (minor units with None for bad values, {row position: error message}).
+        """
+        parsed, errors = parse_amount_column(values)
+        for position, message in errors.items():
+            errors[position] = f"'{column_name}' must be a valid amount ({message}). (got '{values[position]}')"
+        return parsed, errors
+
+    def import_rows(self, rows, line_numbers, record=True):
+        """
+        Validates many rows at once and adds all valid rows to the ledger as a single batch.
+        line_numbers gives the source line of each row for error messages.
+        record=False skips the journal (for rows that come from the source workbook).
+        Returns (number of rows added, list of error messages for every rejected row).
+        """
+        column_count = len(self.headers)
+        errors = {}
+        good_rows = []
+        good_lines = []
+        for position, row in enumerate(rows):
+            if len(row) != column_count:
+                errors[position] = (f"Line {line_numbers[position]}: expected {column_count} columns, "
+                                    f"got {len(row)}.")
+            else:
+                good_rows.append(row)
+                good_lines.append(line_numbers[position])
+
+        # Validate column by column instead of row by row
+        columns = list(zip(*good_rows)) if good_rows else [()] * column_count
+        deposits, deposit_errors = self._parse_numeric_column(columns[-2], self.headers[-2])
+        withdrawals, withdrawal_errors = self._parse_numeric_column(columns[-1], self.headers[-1])
+
+        bad_positions = set(deposit_errors) | set(withdrawal_errors)
+        row_errors = {}
+        for position in bad_positions:
+            row_errors[good_lines[position]] = f"Line {good_lines[position]}: " + "; ".join(
+                message for message in (deposit_errors.get(position), withdrawal_errors.get(position)) if message)
+
+        if bad_positions:
+            keep = [position not in bad_positions for position in range(len(good_rows))]
+            columns = [[value for value, ok in zip(column, keep) if ok] for column in columns]
+            deposits = [value for value, ok in zip(deposits, keep) if ok]
+            withdrawals = [value for value, ok in zip(withdrawals, keep) if ok]
+
+        text_columns = [["" if value is None else str(value) for value in column] for column in columns[:-2]]
+        self.search_index.add_rows(self.ledger.extend_columns(text_columns, [deposits, withdrawals]))
+        self.edit_count += 1
+        if self.journal and record and deposits:
+            self.journal.record_add_many(zip(*text_columns, map(format_amount, deposits),
+                                             map(format_amount, withdrawals)))
+
+        # Report every problem sorted by line number
+        all_errors = {line_numbers[position]: message for position, message in errors.items()}
+        all_errors.update(row_errors)
+        return len(deposits), [all_errors[line] for line in sorted(all_errors)]
+
+    def import_file(self, file_path):
+        """
+        Bulk-imports rows from a .csv or .xlsx file whose first row matches the headers.
+        Returns (number of rows added, list of error messages).
+        """
+        if file_path.lower().endswith('.csv'):
+            header, rows, line_numbers = read_csv_rows(file_path)
+        else:
+            header, rows, line_numbers = read_xlsx_rows(file_path)
+
+        check_header(header, self.headers)
+        return self.import_rows(rows, line_numbers)
+
+    def import_pasted_text(self, text):
+        """
+        Adds a pasted block of rows (see read_pasted_rows) as a single batch.
+        A copied header row at the top is skipped. Returns (number of rows added, list of error messages).
+        """
+        rows, line_numbers = read_pasted_rows(text)
+        if rows and tuple(rows[0]) == tuple(self.headers):
+            del rows[0], line_numbers[0]
+        return self.import_rows(rows, line_numbers)
 
     # 🟢 UPDATED: Changed signature to accept dynamic arguments (*data_values)
     def add_data_row(self, *data_values): 
-        """Adds a new row of data to the Excel sheet based on positional arguments."""
-        next_row = self.sheet.max_row + 1
-        
+        """Adds a new row of data to the ledger based on positional arguments."""
         if len(data_values) != len(self.headers):
             raise ValueError("Data provided does not match the expected number of columns.")
 
@@ -94,50 +336,195 @@ class ExcelGenerator:
         # Create the final list of values to write: strings first, then validated numbers
         final_values = list(data_values[:-2]) + [deposit, withdrawal]
 
-        # Write data dynamically
-        for col_idx, value in enumerate(final_values, start=1):
-            self.sheet.cell(row=next_row, column=col_idx, value=value)
+        row_id = self.ledger.append_row(final_values)
+        self.search_index.add_rows(range(row_id, row_id + 1))
+        self.edit_count += 1
+        if self.journal:
+            self.journal.record_add(final_values[:-2] + [format_amount(deposit), format_amount(withdrawal)])
+        return row_id
             
     # 🟢 NEW: Method required for Treeview editing in main.py
     def update_data_cell(self, user_row_index, col_name, new_value):
         """
         Updates a single cell based on the user-facing row index and column name.
         """
+        return self.update_cell(self.row_id_at(user_row_index), col_name, new_value)
+
+    def update_cell(self, row_id, col_name, new_value):
+        """Updates a single cell addressed by its stable row ID and column name (O(1))."""
         
-        # Find the 1-based column index based on the header name
-        try:
-            sheet_col = self.headers.index(col_name) + 1
-        except ValueError:
+        # Find the 0-based column index based on the header name
+        col_index = self.column_index.get(col_name)
+        if col_index is None:
             raise ValueError(f"Internal error: Column '{col_name}' not found.")
-        
-        # Convert user index (1-based, starts at 1) to actual sheet row index (starts at 2)
-        sheet_row = user_row_index + 1
-        
-        # Check if the row index is valid
-        if 1 < sheet_row <= self.sheet.max_row:
-            
-            # Dynamic type validation and coercion
-            try:
-                if col_name in [self.headers[-2], self.headers[-1]]: # 입금, 출금
-                    # Use helper for validation
-                    typed_value = self._validate_numeric(new_value, col_name)
-                else:
-                    # Treat '부서' and '항목' as strings
-                    typed_value = str(new_value)
-            except ValueError as e:
-                raise ValueError(str(e)) # Re-raise error for GUI to display
-
-            # Update the cell in the openpyxl sheet
-            self.sheet.cell(row=sheet_row, column=sheet_col, value=typed_value)
-            return True
+
+        # Dynamic type validation and coercion
+        if col_name in self.amount_headers:
+            # Use helper for validation
+            typed_value = self._validate_numeric(new_value, col_name)
         else:
+            # Treat '부서' and '항목' as strings
+            typed_value = str(new_value)
+
+        # Update the value in the ledger
+        try:
+            self.ledger.set_value(row_id, col_index, typed_value)
+        except KeyError:
+            raise ValueError(f"Error: Row {row_id} does not exist.")
+        self.search_index.update_row(row_id, col_index)
+        self.edit_count += 1
+        if self.journal:
+            # Amounts are journaled as text, so replay parses them back to the same minor units
+            journal_value = format_amount(typed_value) if col_name in self.amount_headers else typed_value
+            self.journal.record_update(row_id, col_name, journal_value)
+        return True
+
+    def delete_row(self, row_id):
+        """Deletes a row by its row ID. The IDs of the other rows do not change."""
+        try:
+            self.ledger.delete_row(row_id)
+        except KeyError:
+            raise ValueError(f"Error: Row {row_id} does not exist.")
+        self.edit_count += 1
+        if self.journal:
+            self.journal.record_delete(row_id)
+
+    def sort_rows(self, col_name, reverse=False):
+        """Reorders the rows by one column. Row IDs stay bound to the same data."""
+        col_index = self.column_index.get(col_name)
+        if col_index is None:
+            raise ValueError(f"Internal error: Column '{col_name}' not found.")
+        self.ledger.sort(col_index, reverse)
+        self.edit_count += 1
+        if self.journal:
+            self.journal.record_sort(col_name, reverse)
+
+    def row_id_at(self, user_row_index):
+        """Returns the stable row ID of the row shown at the user-facing index (starts at 1)."""
+        if not 1 <= user_row_index <= len(self.ledger):
             raise ValueError(f"Error: Row index {user_row_index} is out of range.")
-        
-    def save_file(self, file_path):
-        """Saves the workbook to the specified full file path."""
+        return self.ledger.row_id_at(user_row_index - 1)
+
+    def search_rows(self, text="", min_amount=None, max_amount=None):
+        """Row IDs (in display order) of the rows matching the preview filter; see LedgerSearchIndex.search."""
+        return self.search_index.search(text, min_amount, max_amount)
+
+    def get_row_count(self):
+        """Returns the number of data rows (the header row is not counted)."""
+        return len(self.ledger)
+
+    def get_data_row(self, user_row_index):
+        """Returns the values of one data row, addressed by its user-facing index (starts at 1)."""
+        return self.get_row(self.row_id_at(user_row_index))
+
+    def get_row(self, row_id):
+        """Returns the values of one data row, addressed by its stable row ID (amounts as Amount)."""
         try:
-            self.workbook.save(file_path)
-            return True
-        except Exception as e:
-            print(f"Error saving file: {e}")
-            return False
\ No newline at end of file
+            row = self.ledger.get_row(row_id)
+        except KeyError:
+            raise ValueError(f"Error: Row {row_id} does not exist.")
+        row[-2:] = Amount(row[-2]), Amount(row[-1])
+        return row
+
+    def iter_rows(self):
+        """Yields every data row as a tuple, in order (the header row is not included)."""
+        for row in self.ledger.iter_rows():
+            yield row[:-2] + (Amount(row[-2]), Amount(row[-1]))
+
+    def iter_cell_rows(self, ledger=None):
+        """
+        Yields every data row (of ledger, default: this generator's) as workbook cell values
+        (amounts in whole units, or Decimal with cents).
+        """
+        for row in (self.ledger if ledger is None else ledger).iter_rows():
+            yield row[:-2] + (to_cell_value(row[-2]), to_cell_value(row[-1]))
+
+    def build_workbook(self, ledger=None):
+        """Builds an openpyxl workbook with the header row followed by all ledger rows."""
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.title = "Data Entry"
+        sheet.append(list(self.headers))
+        for row in self.iter_cell_rows(ledger):
+            sheet.append(row)
+        return workbook
+        
+    def write_streaming(self, file_path, ledger=None, progress_callback=None):
+        """
+        Writes the ledger with openpyxl's write-only workbook: the header, then the rows from a generator.
+        No cell objects are kept around, so memory stays flat regardless of the ledger size.
+        progress_callback(phase, done, total) is called every SAVE_PROGRESS_ROWS rows ('write') and
+        once before the workbook is zipped ('save').
+        """
+        ledger = self.ledger if ledger is None else ledger
+        total = len(ledger)
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet("Data Entry")
+        sheet.append(list(self.headers))
+        for row_number, row in enumerate(self.iter_cell_rows(ledger), start=1):
+            sheet.append(row)
+            if progress_callback and row_number % SAVE_PROGRESS_ROWS == 0:
+                progress_callback('write', row_number, total)
+        if progress_callback:
+            progress_callback('save', total, total)
+        workbook.save(file_path)
+
+    def snapshot(self):
+        """
+        Copies the rows for a background save (see write_file). Only arrays are copied, so this is
+        fast enough for the Tk thread even for large ledgers.
+        """
+        return SaveSnapshot(self.ledger.copy(), self.edit_count, self.journal.mark() if self.journal else None)
+
+    def write_file(self, file_path, snapshot=None, streaming=True, progress_callback=None):
+        """
+        Writes the rows (of snapshot, if given) as a workbook to file_path. The file is written to a temporary
+        file and renamed into place, so an existing file is never left half-written. Errors are raised.
+        With a snapshot only the snapshot is read, so this may run on a worker thread while editing goes on.
+        streaming=False builds a regular (edit-mode) workbook instead; progress_callback: see write_streaming.
+        """
+        ledger = self.ledger if snapshot is None else snapshot.ledger
+        if streaming:
+            write_func = lambda temp_path: self.write_streaming(temp_path, ledger, progress_callback)
+        else:
+            write_func = lambda temp_path: self.build_workbook(ledger).save(temp_path)
+        atomic_save(file_path, write_func)
+
+    def finish_save(self, file_path, snapshot=None):
+        """
+        Makes the saved file the recovery baseline once write_file has succeeded (call it on the editing thread).
+        Row IDs are renumbered to match the saved row order and the journal restarts from the saved file, so
+        later edits replay against it. Edits made after the snapshot are kept in the ledger and the journal
+        (renumbered the same way). Returns True if there were such edits, i.e. the file is already behind.
+        """
+        self.source_path = file_path
+        edited = snapshot is not None and snapshot.edit_count != self.edit_count
+        if not self.journal:
+            return edited
+
+        if not edited:
+            if self.ledger.compact():
+                self.search_index = LedgerSearchIndex(self.ledger)
+            self.journal.compact(self.headers, source_path=file_path)
+            return False
+
+        # The saved rows come first (in the snapshot's order), then every row added since
+        positions = list(snapshot.ledger.order)
+        positions.extend(range(len(snapshot.ledger.live), len(self.ledger.live)))
+        id_map = self.ledger.rebase(positions)
+        self.search_index = LedgerSearchIndex(self.ledger)
+        later_records = self.journal.records_since(snapshot.journal_mark)
+        for record in later_records:
+            if "id" in record:
+                record["id"] = id_map[record["id"]]
+        self.journal.compact(self.headers, source_path=file_path, keep_records=later_records)
+        return True
+
+    def save_file(self, file_path, streaming=True):
+        """
+        Saves the ledger as a workbook to the specified full file path (write_file and finish_save on this thread).
+        Returns True; errors are raised so the caller can show the real cause.
+        """
+        self.write_file(file_path, streaming=streaming)
+        self.finish_save(file_path)
+        return True
@@ -0,0 +1,29 @@
+import os
+import threading
+
+
+def atomic_save(target_path, write_func, before_replace=None):
+    """
+    Writes a file through write_func(temp_path) and then renames it over target_path.
+
+    The temporary file lives next to the target so the final os.replace is atomic: an interrupted
+    or failed save leaves any existing file untouched and removes the partial temporary file.
+    before_replace() (optional) runs after writing and may raise to abort the save.
+    """
+    target_dir, target_name = os.path.split(os.path.abspath(target_path))
+    temp_path = os.path.join(target_dir, f".{target_name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+    try:
+        write_func(temp_path)
+
+        # Make sure the data is on disk before the rename makes it visible
+        with open(temp_path, 'rb') as written_file:
+            os.fsync(written_file.fileno())
+
+        if before_replace:
+            before_replace()
+        os.replace(temp_path, target_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
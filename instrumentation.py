@@ -0,0 +1,99 @@
+"""
+Named timing spans for report generation (load, header read, row iteration, table build, save, ...).
+
+Spans are silent by default. Each finished span is passed to an optional callback and logged as a JSON
+record at DEBUG level on the "financial_program.spans" logger, so the GUI, the batch CLI and the
+benchmarks can consume the same data.
+"""
+
+import json
+import logging
+import time
+import tracemalloc
+
+logger = logging.getLogger("financial_program.spans")
+
+
+class Span:
+    """
+    One measured phase. seconds is the wall time between begin() and end(), or, for accumulating
+    spans, the sum of the intervals added with add_time(). peak_memory_delta (bytes above the memory in
+    use when the span began) is only recorded while tracemalloc is tracing.
+
+    tracemalloc keeps a single process-wide peak, which spans never reset: spans overlap, and callers
+    such as the benchmark read that peak too. If the peak rose during the span, the span reached it and
+    peak_memory_delta is exact (peak_memory_exact is True); otherwise the span stayed below an earlier
+    peak and peak_memory_delta is only the memory still in use at its end, a lower bound.
+    """
+    __slots__ = ('name', 'seconds', 'rows', 'peak_memory_delta', 'peak_memory_exact', 'accumulate', '_start',
+                 '_start_memory', '_start_peak')
+
+    def __init__(self, name, accumulate=False):
+        self.name = name
+        self.seconds = 0.0
+        self.rows = None
+        self.peak_memory_delta = None
+        self.peak_memory_exact = None
+        self.accumulate = accumulate
+        self._start = time.perf_counter()
+        self._start_memory = None
+        self._start_peak = None
+
+    def add_time(self, seconds):
+        self.seconds += seconds
+
+    def to_dict(self):
+        return {"span": self.name, "seconds": round(self.seconds, 6), "rows": self.rows,
+                "peak_memory_delta": self.peak_memory_delta, "peak_memory_exact": self.peak_memory_exact}
+
+
+class Instrumentation:
+    """Creates spans and reports each finished one to the callback (if any) and the debug logger."""
+
+    def __init__(self, callback=None, track_memory=False):
+        self.callback = callback
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def begin(self, name, accumulate=False):
+        span = Span(name, accumulate)
+        if tracemalloc.is_tracing():
+            span._start_memory, span._start_peak = tracemalloc.get_traced_memory()
+        return span
+
+    def end(self, span, rows=None):
+        if not span.accumulate:
+            span.seconds = time.perf_counter() - span._start
+        if rows is not None:
+            span.rows = rows
+        if span._start_memory is not None and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            span.peak_memory_exact = peak > span._start_peak
+            span.peak_memory_delta = (peak if span.peak_memory_exact else current) - span._start_memory
+
+        if self.callback:
+            self.callback(span)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(json.dumps(span.to_dict()))
+        return span
+
+    def span(self, name):
+        """Context manager for a plain (non-accumulating) span: with instrumentation.span('save'): ..."""
+        return _SpanContext(self, name)
+
+
+class _SpanContext:
+    __slots__ = ('instrumentation', 'name', 'span')
+
+    def __init__(self, instrumentation, name):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.span = None
+
+    def __enter__(self):
+        self.span = self.instrumentation.begin(self.name)
+        return self.span
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.instrumentation.end(self.span)
+        return False
@@ -0,0 +1,214 @@
+"""
+Append-only edit journal for the Excel entry window.
+
+Every edit made through ExcelGenerator is appended as one JSON line, so a crash or an accidental
+close can be recovered by replaying the journal. Writes are flushed to the OS right away and fsync'ed
+in batches, keeping the cost per edit O(1) regardless of the ledger size. A successful save compacts
+(empties) the journal, because everything in it is then in the saved file; edits made while a background
+save was running are kept (renumbered to the saved file's row IDs). When the session started from an
+existing workbook (or after a save), the 'start' record names that file and replay reloads it before
+re-applying the edits.
+"""
+
+import json
+import os
+import time
+
+DEFAULT_JOURNAL_PATH = os.path.join(os.path.expanduser("~"), ".financial_program", "excel_session.journal")
+
+# fsync after this many records or this many seconds, whichever comes first
+FSYNC_EVERY_RECORDS = 64
+FSYNC_INTERVAL_SECONDS = 1.0
+
+
+class EditJournal:
+    """Line-based JSON journal: a 'start' record with the headers, then add/add_many/update/delete/sort records."""
+
+    def __init__(self, path=DEFAULT_JOURNAL_PATH):
+        self.path = path
+        self._file = None
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    # --- Reading / recovery ---
+
+    def read_records(self):
+        """
+        Returns the records in the journal. A truncated last line (the process died mid-write)
+        is ignored; anything after the first unreadable line is not trusted.
+        """
+        records = []
+        try:
+            with open(self.path, encoding="utf-8") as journal_file:
+                for line in journal_file:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        break
+        except FileNotFoundError:
+            pass
+        return records
+
+    def records_since(self, mark):
+        """Returns the records appended after mark (a value returned by mark()), like read_records."""
+        records = []
+        try:
+            with open(self.path, "rb") as journal_file:
+                journal_file.seek(mark)
+                for line in journal_file:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        break
+        except FileNotFoundError:
+            pass
+        return records
+
+    def _valid_length(self):
+        """Byte length of the leading complete, readable records."""
+        length = 0
+        with open(self.path, "rb") as journal_file:
+            for line in journal_file:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    json.loads(line)
+                except ValueError:
+                    break
+                length += len(line)
+        return length
+
+    def has_unsaved_edits(self):
+        """True if the journal holds edits that were never saved."""
+        return any(record.get("op") != "start" for record in self.read_records())
+
+    def replay(self, generator):
+        """
+        Re-applies the journal to a fresh ExcelGenerator. Returns the number of records applied.
+        The generator must not have this journal attached yet, or the edits would be recorded twice.
+        """
+        applied = 0
+        for record in self.read_records():
+            op = record.get("op")
+            if op == "start":
+                if list(record.get("headers", [])) != list(generator.headers):
+                    raise ValueError("The recovery journal was written for different columns.")
+                # The session started from an existing workbook: reload it, then replay the edits
+                if record.get("source"):
+                    generator.load_file(record["source"])
+                continue
+            if op == "add":
+                generator.add_data_row(*record["values"])
+            elif op == "add_many":
+                generator.import_rows(record["rows"], list(range(len(record["rows"]))))
+            elif op == "update":
+                # Row IDs are assigned in append order, so replaying the same edits reproduces them
+                generator.update_cell(record["id"], record["col"], record["value"])
+            elif op == "delete":
+                generator.delete_row(record["id"])
+            elif op == "sort":
+                generator.sort_rows(record["col"], record["reverse"])
+            else:
+                continue
+            applied += 1
+        return applied
+
+    # --- Writing ---
+
+    def start(self, headers, keep_existing=False, source_path=None):
+        """
+        Opens the journal for appending. Unless keep_existing is set, previous records are discarded.
+        source_path is the workbook the session started from (None for a new ledger).
+        """
+        self.close()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        if keep_existing and os.path.exists(self.path):
+            # Cut off a torn last record so new records start on a clean line
+            with open(self.path, "r+b") as journal_file:
+                journal_file.truncate(self._valid_length())
+            self._file = open(self.path, "a", encoding="utf-8")
+        else:
+            self._file = open(self.path, "w", encoding="utf-8")
+            start_record = {"op": "start", "headers": list(headers)}
+            if source_path:
+                start_record["source"] = os.path.abspath(source_path)
+            self._append(start_record)
+            self.sync()
+
+    def record_add(self, values):
+        self._append({"op": "add", "values": list(values)})
+
+    def record_add_many(self, rows):
+        self._append({"op": "add_many", "rows": [list(row) for row in rows]})
+
+    def record_update(self, row_id, col_name, value):
+        self._append({"op": "update", "id": row_id, "col": col_name, "value": value})
+
+    def record_delete(self, row_id):
+        self._append({"op": "delete", "id": row_id})
+
+    def record_sort(self, col_name, reverse):
+        self._append({"op": "sort", "col": col_name, "reverse": reverse})
+
+    def _append(self, record):
+        if self._file is None:
+            return
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        # flush() hands the record to the OS (safe against a process crash); fsync is batched
+        self._file.flush()
+        self._pending += 1
+        if (self._pending >= FSYNC_EVERY_RECORDS
+                or time.monotonic() - self._last_sync >= FSYNC_INTERVAL_SECONDS):
+            self.sync()
+
+    def mark(self):
+        """Current end of the journal (a byte offset), to read the records appended after it with records_since."""
+        if self._file is None:
+            return None
+        self._file.flush()
+        return os.fstat(self._file.fileno()).st_size
+
+    def sync(self):
+        """Forces pending records to disk (also called from a GUI timer)."""
+        if self._file is not None and self._pending:
+            os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def compact(self, headers, source_path=None, keep_records=()):
+        """
+        Drops all edit records after a successful save; only the 'start' record (naming the saved file) remains,
+        followed by keep_records (edits made after the saved snapshot, with row IDs of the saved file).
+        """
+        self.start(headers, source_path=source_path)
+        for record in keep_records:
+            self._append(record)
+        self.sync()
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def set_aside(self):
+        """
+        Closes the journal and renames it to a timestamped '.failed' file, so a new session can start without
+        destroying edits that could not be replayed (e.g. the source workbook is on a drive that is not mounted).
+        Returns the backup path, or None if there was no journal.
+        """
+        self.close()
+        backup_path = f"{self.path}.{time.strftime('%Y%m%d-%H%M%S')}.failed"
+        try:
+            os.replace(self.path, backup_path)
+        except FileNotFoundError:
+            return None
+        return backup_path
+
+    def discard(self):
+        """Closes and deletes the journal (the user declined recovery)."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,287 @@
+from array import array
+from bisect import bisect_left, insort
+
+# Deleted rows are dropped from the display order in batches of this many (or when it is next read in full)
+PURGE_DELETED_ROWS = 256
+
+
+class TextColumn:
+    """
+    Dictionary-encoded text column (used for 부서 and 항목).
+    Each distinct value is stored once; rows only keep a small integer code in an array.
+    """
+    __slots__ = ('codes', 'values', '_lookup')
+
+    def __init__(self):
+        self.codes = array('I')   # One code per row
+        self.values = []          # Code -> distinct value
+        self._lookup = {}         # Distinct value -> code
+
+    def _encode(self, value):
+        code = self._lookup.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self._lookup[value] = code
+        return code
+
+    def append(self, value):
+        self.codes.append(self._encode(value))
+
+    def extend(self, values):
+        encode = self._encode
+        self.codes.extend([encode(value) for value in values])
+
+    def get(self, position):
+        return self.values[self.codes[position]]
+
+    def set(self, position, value):
+        self.codes[position] = self._encode(value)
+
+    def copy(self):
+        clone = TextColumn()
+        clone.codes = self.codes[:]
+        clone.values = self.values[:]
+        clone._lookup = dict(self._lookup)
+        return clone
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __iter__(self):
+        values = self.values
+        return (values[code] for code in self.codes)
+
+
+class Ledger:
+    """
+    Compact columnar storage for ledger rows.
+    All columns except the last two are TextColumns; the last two (입금, 출금) are signed 64-bit integer arrays.
+
+    Storage is append-only, so every row keeps a stable row ID (its storage position + 1) for its whole life.
+    The display order is a separate array of storage positions, which is what deletes and sorts change;
+    looking up a cell by row ID is O(1) no matter how the rows were deleted or reordered.
+
+    A delete only clears the row's live flag and notes where the row sits in the display order; deleted
+    rows are dropped from the order array in batches (see PURGE_DELETED_ROWS) or when the whole order is
+    read, so deleting is O(log n) instead of a search and shift of the whole array.
+    """
+    __slots__ = ('headers', 'text_columns', 'amount_columns', '_order', 'live', 'in_storage_order',
+                 '_deleted_indexes', '_ascending', '_ranks')
+
+    def __init__(self, headers):
+        if len(headers) < 2:
+            raise ValueError("A ledger needs at least the two amount columns (입금, 출금).")
+        self.headers = tuple(headers)
+        self.text_columns = [TextColumn() for _ in self.headers[:-2]]
+        self.amount_columns = [array('q'), array('q')]
+        self._order = array('q')  # Display order (storage positions), still holding rows deleted since the last purge
+        self.live = bytearray()   # One flag per storage position; 0 once the row is deleted
+        self.in_storage_order = True  # False after any delete or sort
+        self._deleted_indexes = []  # Sorted indexes into _order of the deleted rows not purged yet
+        self._ascending = True      # _order is in increasing storage position (no sort since the last compact)
+        self._ranks = None          # Storage position -> index in _order, built when needed after a sort
+
+    def __len__(self):
+        """Number of rows that still exist (deleted rows are not counted)."""
+        return len(self._order) - len(self._deleted_indexes)
+
+    @property
+    def order(self):
+        """Display order: the storage positions of the rows that still exist."""
+        if self._deleted_indexes:
+            self._purge()
+        return self._order
+
+    @order.setter
+    def order(self, order):
+        self._order = order
+        self._deleted_indexes = []
+        self._ranks = None
+
+    def _purge(self):
+        """Drops the deleted rows from _order (one pass over it)."""
+        live = self.live
+        self.order = array('q', [position for position in self._order if live[position]])
+
+    def _rank_map(self):
+        """Storage position -> index in _order; built once per reordering (one pass), then kept up to date."""
+        if self._ranks is None:
+            ranks = array('q', bytes(8 * len(self.live)))
+            for index, position in enumerate(self._order):
+                ranks[position] = index
+            self._ranks = ranks
+        return self._ranks
+
+    def _index_in_order(self, position):
+        """Index of a storage position in _order: a binary search, or the rank map after a sort."""
+        if self._ascending:
+            return bisect_left(self._order, position)
+        return self._rank_map()[position]
+
+    def display_sorted(self, positions):
+        """
+        Sorts storage positions of existing rows into display order in O(k log k) for k positions,
+        without a pass over the whole order (except to build the rank map once after a sort).
+        """
+        if self._ascending:
+            return sorted(positions)
+        return sorted(positions, key=self._rank_map().__getitem__)
+
+    def copy(self):
+        """Independent copy (array copies only), e.g. a snapshot to save on another thread while editing goes on."""
+        clone = Ledger.__new__(Ledger)
+        clone.headers = self.headers
+        clone.text_columns = [column.copy() for column in self.text_columns]
+        clone.amount_columns = [column[:] for column in self.amount_columns]
+        clone._order = self.order[:]
+        clone.live = self.live[:]
+        clone.in_storage_order = self.in_storage_order
+        clone._deleted_indexes = []
+        clone._ascending = self._ascending
+        clone._ranks = None
+        return clone
+
+    def _storage_size(self):
+        return len(self.amount_columns[0])
+
+    def append_row(self, values):
+        """Appends one already validated row (text values first, then the two integer amounts). Returns its row ID."""
+        position = self._storage_size()
+        text_count = len(self.text_columns)
+        for column, value in zip(self.text_columns, values[:text_count]):
+            column.append(value)
+        for column, value in zip(self.amount_columns, values[text_count:]):
+            column.append(value)
+        if self._ranks is not None:
+            self._ranks.append(len(self._order))
+        self._order.append(position)
+        self.live.append(1)
+        return position + 1
+
+    def extend_columns(self, text_values, amount_values):
+        """
+        Appends many already validated rows at once, given column by column
+        (one sequence per text column and one per amount column). Returns the range of new row IDs.
+        """
+        start = self._storage_size()
+        for column, values in zip(self.text_columns, text_values):
+            column.extend(values)
+        for column, values in zip(self.amount_columns, amount_values):
+            column.extend(values)
+        end = self._storage_size()
+        if self._ranks is not None:
+            self._ranks.extend(range(len(self._order), len(self._order) + end - start))
+        self._order.extend(range(start, end))
+        self.live.extend(b"\x01" * (end - start))
+        return range(start + 1, end + 1)
+
+    def row_id_at(self, index):
+        """Row ID of the row shown at the 0-based display index."""
+        if index < 0:
+            index += len(self)
+        # Step over the deleted rows that are still in _order (at most PURGE_DELETED_ROWS)
+        for deleted_index in self._deleted_indexes:
+            if deleted_index > index:
+                break
+            index += 1
+        return self._order[index] + 1
+
+    def position_of(self, row_id):
+        """Storage position of a row ID (O(1)). Raises KeyError for unknown or deleted rows."""
+        position = row_id - 1
+        if not 0 <= position < len(self.live) or not self.live[position]:
+            raise KeyError(row_id)
+        return position
+
+    def get_row(self, row_id):
+        """Returns the values of a row, addressed by its row ID."""
+        position = self.position_of(row_id)
+        return ([column.get(position) for column in self.text_columns]
+                + [column[position] for column in self.amount_columns])
+
+    def set_value(self, row_id, column_index, value):
+        """Overwrites a single value; column_index is the 0-based header index."""
+        position = self.position_of(row_id)
+        text_count = len(self.text_columns)
+        if column_index < text_count:
+            self.text_columns[column_index].set(position, value)
+        else:
+            self.amount_columns[column_index - text_count][position] = value
+
+    def delete_row(self, row_id):
+        """Removes a row from the display order. Its storage slot (and row ID) is never reused."""
+        position = self.position_of(row_id)
+        insort(self._deleted_indexes, self._index_in_order(position))
+        self.live[position] = 0
+        self.in_storage_order = False
+        if len(self._deleted_indexes) >= PURGE_DELETED_ROWS:
+            self._purge()
+
+    def sort(self, column_index, reverse=False):
+        """Reorders the rows by one column (stable sort). Row IDs do not change."""
+        text_count = len(self.text_columns)
+        if column_index < text_count:
+            column = self.text_columns[column_index]
+            values, codes = column.values, column.codes
+            key = lambda position: str(values[codes[position]])
+        else:
+            key = self.amount_columns[column_index - text_count].__getitem__
+        self.order = array('q', sorted(self.order, key=key, reverse=reverse))
+        self.in_storage_order = False
+        self._ascending = False
+
+    def compact(self):
+        """
+        Rewrites the storage in display order without the deleted rows, so the row IDs become 1..len again
+        (the same IDs the rows get when the saved file is loaded). Returns False if nothing had to move.
+        """
+        if self.in_storage_order:
+            return False
+        order = self.order
+        for column in self.text_columns:
+            codes = column.codes
+            column.codes = array('I', [codes[position] for position in order])
+        self.amount_columns = [array('q', [column[position] for position in order]) for column in self.amount_columns]
+        self.order = array('q', range(len(order)))
+        self.live = bytearray(b"\x01" * len(order))
+        self.in_storage_order = True
+        self._ascending = True
+        return True
+
+    def rebase(self, positions):
+        """
+        Rewrites the storage in the given order of storage positions, so the row IDs become 1..len(positions).
+        Used after saving a snapshot while editing went on: positions is the snapshot's display order
+        followed by every row added since, which are the IDs a replay of the later edits against the saved
+        file produces. Rows deleted since keep their slot (still deleted); rows not in positions must already
+        be deleted. Returns {old row ID: new row ID}.
+        """
+        # Read (and purge) the order before live is rewritten: the purge looks positions up in live
+        order = self.order
+        new_positions = {position: new_position for new_position, position in enumerate(positions)}
+        for column in self.text_columns:
+            codes = column.codes
+            column.codes = array('I', [codes[position] for position in positions])
+        self.amount_columns = [array('q', [column[position] for position in positions])
+                               for column in self.amount_columns]
+        live = self.live
+        self.live = bytearray([live[position] for position in positions])
+        self.order = array('q', [new_positions[position] for position in order])
+        self.in_storage_order = len(self.order) == len(positions) and self.order == array('q', range(len(positions)))
+        self._ascending = all(earlier < later for earlier, later in zip(self.order, self.order[1:]))
+        return {position + 1: new_position + 1 for position, new_position in new_positions.items()}
+
+    def iter_rows(self):
+        """Yields every row as a tuple, in display order."""
+        if self.in_storage_order:
+            # Fast path: nothing was deleted or reordered
+            return zip(*self.text_columns, *self.amount_columns)
+        return self._iter_ordered_rows()
+
+    def _iter_ordered_rows(self):
+        text_columns = [(column.values, column.codes) for column in self.text_columns]
+        amount_columns = self.amount_columns
+        for position in self.order:
+            yield (tuple(values[codes[position]] for values, codes in text_columns)
+                   + tuple(column[position] for column in amount_columns))
@@ -281,17 +281,37 @@ if __name__ == "__main__":
 '''
 
 
+import os
+import sys
+
+# Headless batch mode: "python main.py report [--jobs N] <dir|glob>" never imports tkinter
+if __name__ == "__main__" and sys.argv[1:2] == ["report"]:
+    import runpy
+    sys.argv = sys.argv[:1] + sys.argv[2:]
+    # Run batch_report as __main__ so process pool workers re-import it instead of this GUI module
+    runpy.run_module("batch_report", run_name="__main__", alter_sys=True)
+
 import tkinter as tk
 from tkinter import messagebox, filedialog
 import tkinter.ttk as ttk # For the Treeview widget
-import os
-import sys
+import threading
+import queue
+import importlib.util
+
+# Modules that pull in openpyxl / python-docx (and lxml). They are imported on first use
+# (or by prewarm_heavy_modules once the window is up), so the dashboard appears without waiting for them.
+HEAVY_MODULES = ("excel_generator", "word_report")
 
 # Import custom classes from other files
 try:
     # Ensure ExcelGenerator and WordReportGenerator methods match the new 4-column structure!
-    from excel_generator import ExcelGenerator
-    from word_report import WordReportGenerator
+    from amount import parse_amount
+    from instrumentation import Instrumentation
+    from journal import DEFAULT_JOURNAL_PATH, EditJournal
+    # Only check that the heavy modules and their dependencies exist; finding a spec does not import them
+    for module_name in HEAVY_MODULES + ("openpyxl", "docx"):
+        if importlib.util.find_spec(module_name) is None:
+            raise ImportError(f"No module named '{module_name}'")
 except ImportError as e:
     print(f"Error importing modules. Ensure all three files are present. Detail: {e}")
     sys.exit(1)
@@ -299,11 +319,26 @@ except ImportError as e:
 # GLOBAL CONFIGURATION VARIABLE
 DATA_HEADERS = ("부서", "항목", "입금", "출금")
 
+# The preview is virtualized: only this many rows (plus a small buffer) exist as Treeview items
+PREVIEW_VISIBLE_ROWS = 10
+PREVIEW_BUFFER_ROWS = 3
+
+# Heavy modules are imported on a background thread this long after the main window is shown
+PREWARM_DELAY_MS = 500
+
+# Opening an existing workbook: chunks read ahead by the loader thread, and chunks added per GUI tick
+LOAD_QUEUE_CHUNKS = 4
+LOAD_CHUNKS_PER_TICK = 2
+LOAD_POLL_MS = 20
+
+# How often the Tk loop checks on a background save
+SAVE_POLL_MS = 50
+
 
 class MainApplication(tk.Tk):
     """The main GUI class for the file generation program using tkinter."""
 
-    def __init__(self):
+    def __init__(self, journal_path=DEFAULT_JOURNAL_PATH):
         super().__init__()
         self.title("Document Automation Tool (macOS)")
         
@@ -328,11 +363,53 @@ class MainApplication(tk.Tk):
         # State variables
         self.current_excel_generator = None
         self.preview_tree = None 
+        self.preview_scrollbar = None
+        # 0-based index of the first data row shown in the virtualized preview
+        self.preview_offset = 0
+        self.preview_visible_rows = PREVIEW_VISIBLE_ROWS
+        # Treeview item -> stable row ID of the data row it currently shows
+        self.preview_item_rows = {}
+        # (column name, reverse) of the last heading sort, or None
+        self.preview_sort = None
+        # Row IDs matching the preview filter (None when no filter is set) and the filter entry widgets
+        self.preview_row_ids = None
+        self.filter_entries = {}
+        self.filter_status = None
+        self.active_cell_editor = None
+        # Pending preview work, flushed once per idle event-loop turn (see schedule_preview_refresh)
+        self.preview_dirty_rows = set()
+        self.preview_dirty_layout = False
+        self.preview_dirty_filter = False
+        self.preview_flush_id = None
         # 🟢 State variable to track the Excel editing window
         self.excel_toplevel_window = None 
+        # State for the background Word report worker
+        self.report_worker = None
+        # (phase name, seconds) of the last report, filled from the worker's spans
+        self.report_phases = []
+        # Crash-recovery journal for the Excel entry window (the benchmark passes a scratch path)
+        self.edit_journal = EditJournal(journal_path)
+        # Background reader while an existing workbook is being opened (None once it is fully loaded)
+        self.workbook_loader = None
+        self.workbook_load_cancel = None
+        self.workbook_load_errors = []
+        self.load_status = None
+        # Background save thread (None when no save is running) and its footer widgets
+        self.save_worker = None
+        self.save_button = None
+        self.save_status = None
+        self.save_progress = None
 
         self.create_widgets()
 
+        # Offer to recover an unsaved session once the main window is shown
+        self.after(200, self.offer_session_recovery)
+        self.after(PREWARM_DELAY_MS, self.start_prewarm)
+
+    def start_prewarm(self):
+        """Imports the heavy modules on a daemon thread, so the first click does not wait for them."""
+        threading.Thread(target=prewarm_heavy_modules, daemon=True).start()
+
     def create_widgets(self):
         """Sets up the visual components (buttons and labels) in the main window."""
         
@@ -359,6 +436,17 @@ class MainApplication(tk.Tk):
         )
         excel_button.pack(pady=10)
 
+        open_button = tk.Button(
+            button_frame,
+            text="Open & Edit Existing Excel File",
+            command=self.open_existing_excel_gui,
+            width=35,
+            height=2,
+            bg='#8BC34A',
+            fg='black'
+        )
+        open_button.pack(pady=10)
+
         word_button = tk.Button(
             button_frame, 
             text="2. Generate Word Report from Excel", 
@@ -374,21 +462,90 @@ class MainApplication(tk.Tk):
     # --- Action 1: Create Excel File (Opens a secondary window) ---
     # ------------------------------------------------------------------
 
-    def open_excel_window(self):
-        """Opens a new top-level window for Excel data entry and live preview."""
+    def show_import_error(self, error, parent=None):
+        """Reports a module (or one of its dependencies) that failed to import on first use."""
+        messagebox.showerror(
+            "Import Error", f"Error importing modules. Ensure all three files are present. Detail: {error}", parent=parent)
+
+    def offer_session_recovery(self):
+        """Asks whether to replay the edit journal left by a crashed or closed session."""
+        if not self.edit_journal.has_unsaved_edits():
+            return
+        if messagebox.askyesno("Recover Unsaved Session",
+                               "The last Excel entry session was not saved.\nDo you want to recover it?"):
+            self.open_excel_window(recover=True)
+        else:
+            self.edit_journal.discard()
+
+    def open_existing_excel_gui(self):
+        """Asks for an existing .xlsx ledger and opens it in the Excel entry window."""
+        if self.excel_toplevel_window and self.excel_toplevel_window.winfo_exists():
+            messagebox.showinfo("Excel Window Open", "Close the current Excel window before opening another file.")
+            self.excel_toplevel_window.lift()
+            return
+
+        file_path = filedialog.askopenfilename(
+            filetypes=[("Excel files", "*.xlsx")],
+            title="Open Existing Excel File"
+        )
+        if not file_path:
+            return
+
+        if self.edit_journal.has_unsaved_edits() and not messagebox.askyesno(
+                "Discard Unsaved Session",
+                "There are unsaved edits from the last session. Opening a file discards them.\nContinue?"):
+            return
+        self.open_excel_window(recover=False, source_path=file_path)
+
+    def open_excel_window(self, recover=None, source_path=None):
+        """
+        Opens a new top-level window for Excel data entry and live preview.
+        recover=True replays the edit journal, False discards it, None asks if there is one.
+        source_path opens an existing workbook; its rows are loaded in the background (see start_workbook_loader).
+        """
         
         # 🟢 FIX 1: Check if window already exists and focus it
         if self.excel_toplevel_window and self.excel_toplevel_window.winfo_exists():
             self.excel_toplevel_window.lift() # Bring to front
             return
-            
+
+        # Imported on first use (already loaded if the prewarm thread has finished)
+        try:
+            from excel_generator import ExcelGenerator
+        except ImportError as e:
+            # The journal is left alone, so the session can still be recovered once the install is fixed
+            self.show_import_error(e)
+            return
+
+        if recover is None:
+            recover = self.edit_journal.has_unsaved_edits() and messagebox.askyesno(
+                "Recover Unsaved Session", "There are unsaved edits from the last session.\nDo you want to recover them?")
+
         self.current_excel_generator = ExcelGenerator(DATA_HEADERS)
+        if source_path and not recover:
+            # Recorded in the journal, so a crash while editing reloads this file before replaying
+            self.current_excel_generator.source_path = source_path
+        if recover:
+            try:
+                self.edit_journal.replay(self.current_excel_generator)
+            except Exception as e:
+                # The failure may be temporary (e.g. the source workbook was moved), so the journal is kept
+                # under another name instead of being overwritten by the new session
+                backup_path = self.edit_journal.set_aside()
+                detail = f"\n\nThe unsaved edits were kept in:\n{backup_path}" if backup_path else ""
+                messagebox.showerror("Recovery Error", f"Could not recover the last session: {e}{detail}")
+                self.current_excel_generator = ExcelGenerator(DATA_HEADERS)
+                recover = False
+        # Every edit from now on is journaled (continuing the replayed journal when recovering)
+        self.current_excel_generator.attach_journal(self.edit_journal, keep_existing=recover)
 
         excel_win = tk.Toplevel(self)
         self.excel_toplevel_window = excel_win # Store reference
         excel_win.title("Excel Data Entry & Live Preview")
+        if self.current_excel_generator.source_path:
+            excel_win.title(f"Excel Data Entry & Live Preview - {os.path.basename(self.current_excel_generator.source_path)}")
         # 🟢 Set behavior on close to destroy reference
-        excel_win.protocol("WM_DELETE_WINDOW", lambda: self.close_excel_window(excel_win))
+        excel_win.protocol("WM_DELETE_WINDOW", lambda: self.on_excel_window_close(excel_win))
 
         
         entry_widgets = {}
@@ -412,7 +569,44 @@ class MainApplication(tk.Tk):
                                text="Add Row", 
                                command=lambda: self.add_row_gui(entry_widgets))
         add_button.grid(row=0, column=current_col, padx=10)
+
+        # --- Bulk Import Button (CSV / XLSX) ---
+        import_button = tk.Button(input_frame,
+                                  text="Import File...",
+                                  command=self.import_file_gui)
+        import_button.grid(row=0, column=current_col + 1, padx=(0, 10))
+
+        # --- Paste Rows Button (tab/newline separated blocks from the clipboard) ---
+        paste_button = tk.Button(input_frame,
+                                 text="Paste Rows",
+                                 command=self.paste_rows_gui)
+        paste_button.grid(row=0, column=current_col + 2, padx=(0, 10))
+
+        # Pasting a multi-row block into any entry field adds the rows instead of inserting the text
+        for entry in entry_widgets.values():
+            entry.bind('<<Paste>>', self.on_paste_rows)
         
+        # --- Filter Box (narrows the preview by 부서/항목 text and amount range) ---
+        filter_frame = tk.Frame(excel_win)
+        filter_frame.pack(side=tk.TOP, fill=tk.X, padx=10, pady=(5, 0))
+
+        self.filter_entries = {}
+        tk.Label(filter_frame, text=f"Filter ({DATA_HEADERS[0]}/{DATA_HEADERS[1]}):").pack(side=tk.LEFT)
+        self.filter_entries['text'] = tk.Entry(filter_frame, width=20)
+        self.filter_entries['text'].pack(side=tk.LEFT, padx=(5, 15))
+        tk.Label(filter_frame, text="Amount:").pack(side=tk.LEFT)
+        self.filter_entries['min'] = tk.Entry(filter_frame, width=12)
+        self.filter_entries['min'].pack(side=tk.LEFT, padx=5)
+        tk.Label(filter_frame, text="~").pack(side=tk.LEFT)
+        self.filter_entries['max'] = tk.Entry(filter_frame, width=12)
+        self.filter_entries['max'].pack(side=tk.LEFT, padx=5)
+        tk.Button(filter_frame, text="Clear", command=self.clear_preview_filter).pack(side=tk.LEFT, padx=10)
+        self.filter_status = tk.Label(filter_frame, text="", anchor="e")
+        self.filter_status.pack(side=tk.RIGHT)
+        for entry in self.filter_entries.values():
+            entry.bind('<KeyRelease>', self.on_filter_changed)
+        self.preview_row_ids = None
+
         # --- Live Preview Table (ttk.Treeview) ---
         table_frame = tk.Frame(excel_win)
         table_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=10, pady=5)
@@ -424,26 +618,48 @@ class MainApplication(tk.Tk):
             table_frame, 
             columns=columns, 
             show='headings',
-            height=10
+            height=PREVIEW_VISIBLE_ROWS
         )
+        self.preview_offset = 0
+        self.preview_visible_rows = PREVIEW_VISIBLE_ROWS
+        self.preview_item_rows = {}
+        self.preview_sort = None
         
         # 🟢 FIX 3: Bind the click event AFTER defining the Treeview
         self.preview_tree.bind('<Button-1>', self.on_treeview_click)
+
+        # Scrolling moves the virtual window over the data instead of the Treeview itself
+        self.preview_tree.bind('<MouseWheel>', self.on_preview_mousewheel)
+        self.preview_tree.bind('<Button-4>', self.on_preview_mousewheel)
+        self.preview_tree.bind('<Button-5>', self.on_preview_mousewheel)
+        self.preview_tree.bind('<Configure>', self.on_preview_configure)
+
+        # Delete / BackSpace removes the selected rows
+        self.preview_tree.bind('<Delete>', self.delete_selected_rows_gui)
+        self.preview_tree.bind('<BackSpace>', self.delete_selected_rows_gui)
+
+        # Ctrl+V / Cmd+V over the preview pastes rows too
+        self.preview_tree.bind('<<Paste>>', self.on_paste_rows)
         
-        # Configure scrollbar
-        vsb = ttk.Scrollbar(table_frame, orient="vertical", command=self.preview_tree.yview)
+        # Configure scrollbar (drives preview_offset, see on_preview_scroll)
+        vsb = ttk.Scrollbar(table_frame, orient="vertical", command=self.on_preview_scroll)
         vsb.pack(side='right', fill='y')
-        self.preview_tree.configure(yscrollcommand=vsb.set)
+        self.preview_scrollbar = vsb
 
         # Define column headings and widths
         self.preview_tree.heading("#", text="IDX")
         self.preview_tree.column("#", width=50, anchor='center')
         
         # Adjusted Treeview widths for better fit
-        self.preview_tree.heading("dept", text=DATA_HEADERS[0]); self.preview_tree.column("dept", width=150)
-        self.preview_tree.heading("entry", text=DATA_HEADERS[1]); self.preview_tree.column("entry", width=120, anchor='center')
-        self.preview_tree.heading("deposit", text=DATA_HEADERS[2]); self.preview_tree.column("deposit", width=120, anchor='center')
-        self.preview_tree.heading("withdrawal", text=DATA_HEADERS[3]); self.preview_tree.column("withdrawal", width=120, anchor='center')
+        self.preview_tree.column("dept", width=150)
+        self.preview_tree.column("entry", width=120, anchor='center')
+        self.preview_tree.column("deposit", width=120, anchor='center')
+        self.preview_tree.column("withdrawal", width=120, anchor='center')
+
+        # Clicking a data column heading sorts the rows by that column
+        for column_id, col_name in zip(columns[1:], DATA_HEADERS):
+            self.preview_tree.heading(column_id, text=col_name,
+                                      command=lambda name=col_name: self.sort_preview_by(name))
         
         self.preview_tree.pack(fill='both', expand=True)
 
@@ -464,20 +680,178 @@ class MainApplication(tk.Tk):
         excel_win.geometry(f"{win_width}x{win_height}+{center_x}+{center_y}")
         
         # --- Save Button ---
-        save_button = tk.Button(footer_frame, 
+        self.save_button = tk.Button(footer_frame, 
                                  text="Save Excel File", 
                                  command=lambda: self.save_excel_file_gui(excel_win),
                                  bg='#FF9800', fg='black')
-        save_button.pack(pady=5) # Reduced pady to fit better in footer frame
+        self.save_button.pack(pady=5) # Reduced pady to fit better in footer frame
+
+        # --- Save Progress (shown only while a background save runs) ---
+        self.save_progress = ttk.Progressbar(footer_frame, mode='determinate', length=250)
+        self.save_status = tk.Label(footer_frame, text="", fg='gray')
+        self.save_status.pack()
+
+        # --- Resync Button (explicit full rebuild of the preview) ---
+        resync_button = tk.Button(footer_frame,
+                                  text="Resync Preview",
+                                  command=self.resync_preview_gui)
+        resync_button.pack(pady=(0, 5))
+
+        # --- Load Status (progress while an existing workbook is read) ---
+        self.load_status = tk.Label(footer_frame, text="", fg='gray')
+        self.load_status.pack()
+
+        if recover:
+            self.update_treeview_preview()
+        elif source_path:
+            self.start_workbook_loader(source_path)
+        self.after(1000, self._sync_edit_journal)
+
+    # --- Opening an Existing Workbook ---
+
+    def start_workbook_loader(self, source_path):
+        """
+        Reads the workbook on a background thread, chunk by chunk (see iter_xlsx_row_chunks).
+        The Tk loop adds the chunks to the ledger and redraws the preview as they arrive, so the
+        window is usable right away. The queue is bounded, so the reader never runs far ahead.
+        """
+        chunks = queue.Queue(maxsize=LOAD_QUEUE_CHUNKS)
+        cancel_event = threading.Event()
+        self.workbook_load_cancel = cancel_event
+        self.workbook_load_errors = []
+        self.load_status.config(text=f"Loading {os.path.basename(source_path)}...")
+
+        self.workbook_loader = threading.Thread(
+            target=self._run_workbook_loader,
+            args=(source_path, chunks, cancel_event),
+            daemon=True
+        )
+        self.workbook_loader.start()
+        self.after(LOAD_POLL_MS, self._poll_workbook_loader, chunks, cancel_event)
+
+    def _run_workbook_loader(self, source_path, chunks, cancel_event):
+        """Runs on the loader thread. It only reads the file; the ledger is changed on the Tk thread."""
+        def put(event):
+            # Waits for room in the queue, but gives up as soon as the window is closed
+            while not cancel_event.is_set():
+                try:
+                    chunks.put(event, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        try:
+            from excel_generator import iter_xlsx_row_chunks
+            reader = iter_xlsx_row_chunks(source_path, DATA_HEADERS)
+            try:
+                for rows, line_numbers in reader:
+                    if not put(('rows', rows, line_numbers)):
+                        return
+            finally:
+                reader.close()
+            put(('done',))
+        except Exception as e:
+            put(('error', e))
+
+    def _poll_workbook_loader(self, chunks, cancel_event):
+        """Adds up to LOAD_CHUNKS_PER_TICK chunks to the ledger, then redraws the preview once."""
+        if cancel_event.is_set() or cancel_event is not self.workbook_load_cancel:
+            return
+
+        added_rows = False
+        for _ in range(LOAD_CHUNKS_PER_TICK):
+            try:
+                event = chunks.get_nowait()
+            except queue.Empty:
+                break
+
+            if event[0] == 'rows':
+                _, errors = self.current_excel_generator.load_rows(event[1], event[2])
+                self.workbook_load_errors.extend(errors)
+                added_rows = True
+                continue
+
+            # Any other event means the loader has finished
+            if added_rows:
+                self.refresh_preview()
+            self._finish_workbook_load(event)
+            return
+
+        if added_rows:
+            self.refresh_preview()
+            self.load_status.config(text=f"Loading... {self.current_excel_generator.get_row_count():,} rows")
+        self.after(LOAD_POLL_MS, self._poll_workbook_loader, chunks, cancel_event)
+
+    def _finish_workbook_load(self, event):
+        """Handles the loader's last event: ('done',) or ('error', exception)."""
+        self.workbook_loader = None
+        self.workbook_load_cancel = None
+        window = self.excel_toplevel_window
+
+        if event[0] == 'error':
+            if isinstance(event[1], ImportError):
+                self.show_import_error(event[1], parent=window)
+            elif isinstance(event[1], (FileNotFoundError, ValueError)):
+                messagebox.showerror("Open Error", str(event[1]), parent=window)
+            else:
+                messagebox.showerror("Error", f"Failed to open the Excel file: {event[1]}", parent=window)
+            # A partly loaded ledger must never be saved over the original file
+            self.close_excel_window(window)
+            self.edit_journal.discard()
+            return
+
+        errors = self.workbook_load_errors
+        self.workbook_load_errors = []
+        self.load_status.config(text=f"{self.current_excel_generator.get_row_count():,} rows loaded")
+        if errors:
+            shown = "\n".join(errors[:20])
+            if len(errors) > 20:
+                shown += f"\n... and {len(errors) - 20} more."
+            messagebox.showwarning("File Opened With Errors",
+                                   f"{len(errors):,} rows could not be loaded and will be dropped on save:\n{shown}",
+                                   parent=window)
+
+    def _workbook_loading(self):
+        """True (after telling the user) while an existing workbook is still being read."""
+        if self.workbook_loader is None:
+            return False
+        messagebox.showinfo("Still Loading", "Please wait until the file has finished loading.",
+                            parent=self.excel_toplevel_window)
+        return True
+
+    def _sync_edit_journal(self):
+        """Periodically forces batched journal records to disk while the Excel window is open."""
+        if self.excel_toplevel_window and self.excel_toplevel_window.winfo_exists():
+            self.edit_journal.sync()
+            self.after(1000, self._sync_edit_journal)
+
+    def on_excel_window_close(self, window):
+        """Close button of the Excel window. It stays open while a save is running, so the save can finish."""
+        if self.save_worker is not None:
+            messagebox.showinfo("Still Saving", "Please wait until the file has been saved.", parent=window)
+            return
+        self.close_excel_window(window)
 
     def close_excel_window(self, window):
         """Handles the window close event to clear the window reference."""
         # Reset the reference when the window is closed
         self.excel_toplevel_window = None
+        # Stop reading a workbook that is still loading
+        if self.workbook_load_cancel is not None:
+            self.workbook_load_cancel.set()
+        self.workbook_loader = None
+        self.cancel_preview_refresh()
+        # Unsaved edits stay in the journal and are offered for recovery next time
+        self.edit_journal.close()
         window.destroy()
 
     def add_row_gui(self, entry_widgets):
         """Calls the backend to add a row and updates the Treeview preview."""
+        # Rows typed while a file is loading would get row IDs the journal replay cannot reproduce
+        if self._workbook_loading():
+            return
+
         dept = entry_widgets[DATA_HEADERS[0]].get()
         entry = entry_widgets[DATA_HEADERS[1]].get()
         deposit = entry_widgets[DATA_HEADERS[2]].get()
@@ -487,7 +861,8 @@ class MainApplication(tk.Tk):
             try:
                 self.current_excel_generator.add_data_row(dept, entry, deposit, withdrawal)
                 
-                self.update_treeview_preview()
+                # Only the new row is appended to the preview (no full rebuild)
+                self.append_treeview_row(self.current_excel_generator.get_row_count())
                 
                 for widget in entry_widgets.values():
                     widget.delete(0, tk.END)
@@ -499,6 +874,92 @@ class MainApplication(tk.Tk):
         else:
             messagebox.showerror("Error", "All fields must be filled.")
 
+    def import_file_gui(self):
+        """Bulk-imports a CSV/XLSX file into the current ExcelGenerator and refreshes the preview once."""
+        if self.current_excel_generator is None or self._workbook_loading():
+            return
+
+        file_path = filedialog.askopenfilename(
+            filetypes=[("CSV or Excel files", "*.csv *.xlsx"), ("CSV files", "*.csv"), ("Excel files", "*.xlsx")],
+            title="Import Rows From File",
+            parent=self.excel_toplevel_window
+        )
+        if not file_path:
+            return
+
+        try:
+            added, errors = self.current_excel_generator.import_file(file_path)
+        except ValueError as e:
+            messagebox.showerror("Import Error", str(e), parent=self.excel_toplevel_window)
+            return
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to import the file: {e}", parent=self.excel_toplevel_window)
+            return
+
+        # One preview update for the whole batch
+        self.update_treeview_preview()
+        self._show_import_result("Import", added, errors)
+
+    def _show_import_result(self, action, added, errors):
+        """Reports how many rows a bulk import or paste added, listing the first rejected rows."""
+        if errors:
+            shown = "\n".join(errors[:20])
+            if len(errors) > 20:
+                shown += f"\n... and {len(errors) - 20} more."
+            messagebox.showwarning(f"{action} Finished With Errors",
+                                   f"Added {added:,} rows. {len(errors):,} rows were rejected:\n{shown}",
+                                   parent=self.excel_toplevel_window)
+        else:
+            messagebox.showinfo(f"{action} Finished", f"Added {added:,} rows.", parent=self.excel_toplevel_window)
+
+    def on_paste_rows(self, event):
+        """
+        <<Paste>> handler. A block with tabs or several lines is added as rows; anything else
+        (a single value), or a block that could not be taken (a workbook is still loading),
+        falls through to the normal paste into the focused entry.
+        """
+        try:
+            text = self.clipboard_get()
+        except tk.TclError:
+            return None
+        if '\t' not in text and '\n' not in text.strip():
+            return None
+        if not self.paste_rows(text):
+            return None
+        return "break"
+
+    def paste_rows_gui(self):
+        """Paste Rows button: adds the clipboard contents as rows."""
+        try:
+            text = self.clipboard_get()
+        except tk.TclError:
+            text = ""
+        if not text.strip():
+            messagebox.showinfo("Paste Rows", "The clipboard is empty.", parent=self.excel_toplevel_window)
+            return
+        self.paste_rows(text)
+
+    def paste_rows(self, text):
+        """
+        Validates all pasted rows in one pass, adds them as one batch and refreshes the preview once.
+        Returns False if the rows were not taken (no open workbook, or it is still loading).
+        """
+        if self.current_excel_generator is None or self._workbook_loading():
+            return False
+        self.close_cell_editor()
+        try:
+            added, errors = self.current_excel_generator.import_pasted_text(text)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to paste the rows: {e}", parent=self.excel_toplevel_window)
+            return True
+
+        # Show the end of the data, where the pasted rows were added
+        self.preview_offset = self._preview_row_count()
+        self.refresh_preview()
+        if errors:
+            self._show_import_result("Paste", added, errors)
+        return True
+
     # --- Treeview Editing Methods ---
     
     def on_treeview_click(self, event):
@@ -517,18 +978,19 @@ class MainApplication(tk.Tk):
         # Get the 1-based index of the column (1 for IDX, 2 for dept, etc.)
         column_index = int(column_id.replace('#', '')) - 1
         
-        # Get the user-facing row index from the 'values' list (first element)
-        user_idx_str = self.preview_tree.item(item, 'values')[0]
-        user_row_index = int(user_idx_str)
+        # The item is bound to the stable row ID of the data row it shows
+        row_id = self.preview_item_rows.get(item)
+        if row_id is None or self._workbook_loading():
+            return
         
         # Get the bounding box of the clicked cell
         bbox = self.preview_tree.bbox(item, column_id)
         if not bbox:
             return
 
-        self.start_cell_editor(item, column_index, user_row_index, bbox)
+        self.start_cell_editor(item, column_index, row_id, bbox)
         
-    def start_cell_editor(self, item, column_index, user_row_index, bbox):
+    def start_cell_editor(self, item, column_index, row_id, bbox):
         """Creates a temporary entry widget for cell editing."""
         
         # Column index 1 is 'IDX', so subtract 1 to get the index for DATA_HEADERS
@@ -547,21 +1009,24 @@ class MainApplication(tk.Tk):
         # Position the editor over the cell (bbox = (x, y, width, height))
         editor.place(x=bbox[0], y=bbox[1], width=bbox[2], height=bbox[3])
 
+        # Treeview items are reused while scrolling, so an open editor is closed on scroll
+        self.close_cell_editor()
+        self.active_cell_editor = editor
+
         def on_editor_confirm(event):
             """Saves the new value when Enter is pressed."""
             new_value = editor.get()
             
             try:
-                # Call the Excel Generator to update the backend data
-                # Requires 'update_data_cell' in excel_generator.py
-                self.current_excel_generator.update_data_cell(
-                    user_row_index, 
+                # Call the Excel Generator to update the backend data (addressed by row ID)
+                self.current_excel_generator.update_cell(
+                    row_id, 
                     col_name, 
                     new_value
                 )
                 
-                # Update the Treeview and clean up
-                self.update_treeview_preview()
+                # Only the edited row is redrawn; with a filter set, the row may no longer match it
+                self.schedule_preview_refresh(row_ids=(row_id,), layout=self.preview_row_ids is not None)
                 editor.destroy()
                 
             except (ValueError, Exception) as e:
@@ -581,40 +1046,465 @@ class MainApplication(tk.Tk):
         
     # --- Other Methods ---
 
+    def close_cell_editor(self):
+        """Destroys the open cell editor, if any."""
+        if self.active_cell_editor is not None and self.active_cell_editor.winfo_exists():
+            self.active_cell_editor.destroy()
+        self.active_cell_editor = None
+
+    def append_treeview_row(self, user_row_index):
+        """Shows a newly added data row: only the virtual window is redrawn, and only if the row is in it."""
+        if (self.preview_row_ids is not None
+                or self.preview_offset <= user_row_index - 1 < self.preview_offset + self._preview_slot_count()):
+            self.schedule_preview_refresh(layout=True)
+        else:
+            self._update_preview_scrollbar()
+
+    def update_treeview_row(self, item, row_id, display_index):
+        """Binds one existing Treeview item to a row ID and rewrites its values from the backend row."""
+        row = self.current_excel_generator.get_row(row_id)
+        self.preview_item_rows[item] = row_id
+        self.preview_tree.item(item, values=[display_index] + list(row))
+
+    def sort_preview_by(self, col_name):
+        """Heading click: sorts the rows by col_name; clicking the same heading again reverses the order."""
+        if self.current_excel_generator is None or self._workbook_loading():
+            return
+        reverse = self.preview_sort == (col_name, False)
+        self.close_cell_editor()
+        self.current_excel_generator.sort_rows(col_name, reverse)
+        self.preview_sort = (col_name, reverse)
+
+        for column_id, name in zip(("dept", "entry", "deposit", "withdrawal"), DATA_HEADERS):
+            marker = (" ▼" if reverse else " ▲") if name == col_name else ""
+            self.preview_tree.heading(column_id, text=name + marker)
+        self.refresh_preview()
+
+    def delete_selected_rows_gui(self, event=None):
+        """Deletes the selected rows (by row ID) after asking for confirmation."""
+        if self.current_excel_generator is None or not self.preview_tree:
+            return
+        row_ids = [self.preview_item_rows[item] for item in self.preview_tree.selection()
+                   if item in self.preview_item_rows]
+        if not row_ids or self._workbook_loading():
+            return
+        if not messagebox.askyesno("Delete Rows", f"Delete {len(row_ids)} selected row(s)?",
+                                   parent=self.excel_toplevel_window):
+            return "break"
+
+        self.close_cell_editor()
+        try:
+            for row_id in row_ids:
+                self.current_excel_generator.delete_row(row_id)
+        except ValueError as e:
+            messagebox.showerror("Delete Failed", str(e), parent=self.excel_toplevel_window)
+        self.preview_tree.selection_set(())
+        self.refresh_preview()
+        return "break"
+
     def update_treeview_preview(self):
-        """Refreshes the Treeview with the current data from the ExcelGenerator."""
+        """
+        Rebuilds the whole Treeview from the current data in the ExcelGenerator.
+        This is the explicit resync path; normal edits use append_treeview_row / update_treeview_row.
+        """
         
         for item in self.preview_tree.get_children():
             self.preview_tree.delete(item)
+        self.preview_item_rows = {}
+
+        self.refresh_preview()
+
+    def refresh_preview(self):
+        """Redraws the virtual window, re-running the filter first if one is set (the row set may have changed)."""
+        self.schedule_preview_refresh(layout=True)
+
+    # --- Coalesced Preview Refresh ---
+
+    def schedule_preview_refresh(self, row_ids=(), layout=False, refilter=False):
+        """
+        Records what changed and schedules one flush for when the event loop is idle, so a burst of
+        changes (imports, pastes, scripted edits, wheel scrolling) redraws the preview only once.
+        row_ids: rows whose values changed. layout: the row set, order, scroll position or size changed
+        (a set filter is re-run too). refilter: the filter entries changed.
+        """
+        self.preview_dirty_rows.update(row_ids)
+        self.preview_dirty_layout = self.preview_dirty_layout or layout
+        self.preview_dirty_filter = (self.preview_dirty_filter or refilter
+                                     or (layout and self.preview_row_ids is not None))
+        if self.preview_flush_id is None:
+            self.preview_flush_id = self.after_idle(self.flush_preview_refresh)
+
+    def flush_preview_refresh(self):
+        """
+        Applies the pending preview work in one event-loop turn: the filter, then the virtual window or
+        just the dirty rows in it. Drawing touches at most visible + buffer items. The search is not
+        split across turns: it runs on the ledger's search index, so its cost grows with the number of
+        matching rows, not the ledger size. A term that matches most of a very large ledger can still
+        hold the event loop for that one search.
+        """
+        self.preview_flush_id = None
+        if (self.current_excel_generator is None or not self.preview_tree
+                or not self.preview_tree.winfo_exists()):
+            self._clear_preview_dirty()
+            return
 
-        sheet = self.current_excel_generator.sheet
-        data_row_index = 1 
+        if self.preview_dirty_filter:
+            self.apply_preview_filter()
+            self.preview_dirty_layout = True
 
-        for row in sheet.iter_rows(min_row=2, values_only=True): 
-            display_values = [data_row_index] + list(row)
-            self.preview_tree.insert('', tk.END, values=display_values)
-            data_row_index += 1
+        if self.preview_dirty_layout:
+            self._clear_preview_dirty()
+            self.render_preview_window()
+            return
+
+        # Only values changed: rewrite the visible items bound to dirty rows (others are drawn when scrolled to)
+        dirty = self.preview_dirty_rows
+        for position, item in enumerate(self.preview_tree.get_children(), start=self.preview_offset):
+            row_id = self.preview_item_rows.get(item)
+            if row_id in dirty:
+                dirty.discard(row_id)
+                self.update_treeview_row(item, row_id, position + 1)
+        dirty.clear()
+
+    def flush_preview_now(self):
+        """Runs any pending preview work immediately (e.g. before comparing the preview with the sheet)."""
+        if self.preview_flush_id is not None:
+            self.after_cancel(self.preview_flush_id)
+        self.flush_preview_refresh()
+
+    def cancel_preview_refresh(self):
+        """Drops pending preview work (the Excel window is being closed)."""
+        if self.preview_flush_id is not None:
+            self.after_cancel(self.preview_flush_id)
+            self.preview_flush_id = None
+        self._clear_preview_dirty()
+
+    def _clear_preview_dirty(self):
+        self.preview_dirty_rows.clear()
+        self.preview_dirty_layout = False
+        self.preview_dirty_filter = False
+
+    # --- Preview Filter ---
+
+    def _parse_filter_amount(self, entry):
+        """
+        Amount bound (in minor units, like the ledger) from a filter entry; None if empty or invalid
+        (invalid input is highlighted). Accepts the same formats as the entry fields ("1,000", "₩12.50").
+        """
+        text = entry.get().strip()
+        try:
+            value = parse_amount(text) if text else None
+        except ValueError:
+            entry.config(bg='#FFCDD2')
+            return None
+        entry.config(bg='white')
+        return value
+
+    def on_filter_changed(self, event=None):
+        """Key release in a filter entry. Bursts of keystrokes are coalesced into one search."""
+        self.schedule_preview_refresh(refilter=True)
+
+    def apply_preview_filter(self):
+        """
+        Runs the filter against the generator's search index and stores the matching row IDs.
+        Called from flush_preview_refresh, which redraws the preview afterwards.
+        """
+        if self.current_excel_generator is None or not self.preview_tree or not self.filter_entries:
+            return
+
+        text = self.filter_entries['text'].get()
+        min_amount = self._parse_filter_amount(self.filter_entries['min'])
+        max_amount = self._parse_filter_amount(self.filter_entries['max'])
+
+        previous = self.preview_row_ids
+        if not text.strip() and min_amount is None and max_amount is None:
+            self.preview_row_ids = None
+            self.filter_status.config(text="")
+        else:
+            self.preview_row_ids = self.current_excel_generator.search_rows(text, min_amount, max_amount)
+            self.filter_status.config(
+                text=f"{len(self.preview_row_ids):,} of {self.current_excel_generator.get_row_count():,} rows")
+
+        if previous != self.preview_row_ids:
+            self.close_cell_editor()
+
+    def clear_preview_filter(self):
+        """Empties the filter entries and shows every row again."""
+        for entry in self.filter_entries.values():
+            entry.delete(0, tk.END)
+            entry.config(bg='white')
+        self.schedule_preview_refresh(refilter=True)
+
+    def _preview_row_count(self):
+        """Number of rows the preview can show: the filtered rows, or every row when no filter is set."""
+        if self.preview_row_ids is None:
+            return self.current_excel_generator.get_row_count()
+        return len(self.preview_row_ids)
+
+    def _preview_row_id(self, position):
+        """Row ID shown at the 0-based preview position."""
+        if self.preview_row_ids is None:
+            return self.current_excel_generator.row_id_at(position + 1)
+        return self.preview_row_ids[position]
+
+    # --- Virtualized Preview ---
+
+    def _preview_slot_count(self):
+        """Number of Treeview items kept alive: the visible rows plus a small buffer."""
+        return self.preview_visible_rows + PREVIEW_BUFFER_ROWS
+
+    def render_preview_window(self):
+        """
+        Fills the Treeview with the rows from preview_offset onwards.
+        Existing items are reused; only the item count changes at the edges of the data.
+        """
+        total = self._preview_row_count()
+
+        # Keep the last page full when the data shrinks or the window grows
+        self.preview_offset = max(0, min(self.preview_offset, total - self.preview_visible_rows))
+        first = self.preview_offset
+        last = min(total, first + self._preview_slot_count())
+
+        items = list(self.preview_tree.get_children())
+        needed = last - first
+        for item in items[needed:]:
+            self.preview_tree.delete(item)
+            self.preview_item_rows.pop(item, None)
+        del items[needed:]
+        for _ in range(len(items), needed):
+            items.append(self.preview_tree.insert('', tk.END))
+
+        for item, position in zip(items, range(first, last)):
+            self.update_treeview_row(item, self._preview_row_id(position), position + 1)
+
+        self._update_preview_scrollbar()
+
+    def _update_preview_scrollbar(self):
+        total = self._preview_row_count()
+        if total <= self.preview_visible_rows:
+            self.preview_scrollbar.set(0.0, 1.0)
+        else:
+            first = self.preview_offset / total
+            last = min(self.preview_offset + self.preview_visible_rows, total) / total
+            self.preview_scrollbar.set(first, last)
+
+    def scroll_preview_to(self, offset):
+        """Moves the virtual window so that data row 'offset' (0-based) is at the top."""
+        self.close_cell_editor()
+        self.preview_offset = int(offset)
+        # Wheel and scrollbar bursts are coalesced; render_preview_window clamps the offset
+        self.schedule_preview_refresh(layout=True)
+
+    def on_preview_scroll(self, action, amount, unit=None):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units'|'pages')."""
+        if self.current_excel_generator is None:
+            return
+        if action == 'moveto':
+            total = self._preview_row_count()
+            self.scroll_preview_to(float(amount) * total)
+        elif action == 'scroll':
+            step = self.preview_visible_rows if unit == 'pages' else 1
+            self.scroll_preview_to(self.preview_offset + int(amount) * step)
+
+    def on_preview_mousewheel(self, event):
+        """Mouse wheel over the preview (X11 sends Button-4/5, Windows and macOS send MouseWheel)."""
+        if event.num == 4:
+            units = -3
+        elif event.num == 5:
+            units = 3
+        elif abs(event.delta) >= 120:
+            units = -3 * (event.delta // 120)
+        else:
+            units = -event.delta
+        self.scroll_preview_to(self.preview_offset + units)
+        return "break"
+
+    def on_preview_configure(self, event):
+        """Recomputes how many rows fit when the Treeview is resized."""
+        items = self.preview_tree.get_children()
+        bbox = self.preview_tree.bbox(items[0]) if items else None
+        if not bbox:
+            return
+
+        # bbox = (x, y, width, height): y is the heading height, height is the row height
+        visible_rows = max(1, (event.height - bbox[1]) // max(bbox[3], 1))
+        if visible_rows != self.preview_visible_rows:
+            self.preview_visible_rows = visible_rows
+            self.schedule_preview_refresh(layout=True)
+
+    def check_treeview_consistency(self):
+        """
+        Compares the Treeview items with the rows in the ExcelGenerator.
+        Returns a list of mismatch descriptions (an empty list means the preview matches the sheet).
+        """
+        mismatches = []
+        items = self.preview_tree.get_children()
+        row_count = self._preview_row_count()
+
+        # The preview holds exactly the virtual window starting at preview_offset
+        expected_items = max(0, min(row_count - self.preview_offset, self._preview_slot_count()))
+        if len(items) != expected_items:
+            mismatches.append(f"Preview has {len(items)} rows, expected {expected_items} of {row_count} sheet rows.")
+
+        for position, item in enumerate(items, start=self.preview_offset):
+            if position >= row_count:
+                break
+            data_row_index = position + 1
+            row_id = self._preview_row_id(position)
+            if self.preview_item_rows.get(item) != row_id:
+                mismatches.append(f"Row {data_row_index}: preview is bound to row ID "
+                                  f"{self.preview_item_rows.get(item)}, sheet has row ID {row_id}")
+            row = self.current_excel_generator.get_row(row_id)
+            expected = [str(value) for value in [data_row_index] + list(row)]
+            shown = [str(value) for value in self.preview_tree.item(item, 'values')]
+            if shown != expected:
+                mismatches.append(f"Row {data_row_index}: preview {shown} != sheet {expected}")
+
+        return mismatches
+
+    def resync_preview_gui(self):
+        """Checks the preview against the sheet and rebuilds it from scratch."""
+        if self.current_excel_generator is None or not self.preview_tree:
+            return
+
+        # Pending (not yet flushed) changes are not a mismatch
+        self.flush_preview_now()
+        mismatches = self.check_treeview_consistency()
+        self.update_treeview_preview()
+
+        if mismatches:
+            messagebox.showwarning("Preview Resynced",
+                                   f"The preview was out of sync ({len(mismatches)} mismatches) and has been rebuilt.\n"
+                                   + "\n".join(mismatches[:5]))
             
     def save_excel_file_gui(self, window_to_close):
-        """Prompts for a file name and saves the generated Excel file."""
-        if self.current_excel_generator is None:
+        """
+        Prompts for a file name and saves the generated Excel file in the background (see start_save_worker).
+        A ledger opened from an existing workbook can be written back to that file instead.
+        """
+        if self.current_excel_generator is None or self._workbook_loading():
+            return
+        if self.save_worker is not None:
+            messagebox.showinfo("Still Saving", "The file is already being saved.", parent=window_to_close)
             return
 
-        file_path = filedialog.asksaveasfilename(
-            defaultextension=".xlsx",
-            filetypes=[("Excel files", "*.xlsx")],
-            title="Save Excel File As"
-        )
+        file_path = None
+        source_path = self.current_excel_generator.source_path
+        if source_path:
+            answer = messagebox.askyesnocancel(
+                "Save Excel File",
+                f"Save the changes back to {os.path.basename(source_path)}?\n(Choose 'No' to save as a new file.)",
+                parent=window_to_close)
+            if answer is None:
+                return
+            if answer:
+                file_path = source_path
+
+        if file_path is None:
+            file_path = filedialog.asksaveasfilename(
+                defaultextension=".xlsx",
+                filetypes=[("Excel files", "*.xlsx")],
+                title="Save Excel File As"
+            )
 
         if file_path:
-            if self.current_excel_generator.save_file(file_path):
-                messagebox.showinfo("Success", f"File saved successfully to:\n{os.path.basename(file_path)}")
-                self.close_excel_window(window_to_close) # Use the clean close method
-            else:
-                messagebox.showerror("Error", "Failed to save the Excel file. Check permissions.")
+            self.start_save_worker(file_path, window_to_close)
+
+    # --- Background Save ---
+
+    def start_save_worker(self, file_path, window):
+        """
+        Writes the workbook on a background thread from a snapshot of the ledger, so the window stays
+        usable while a large file is serialized and zipped. The file is written to a temporary file and
+        renamed into place (also over the source file). Edits made meanwhile are kept for the next save.
+        """
+        generator = self.current_excel_generator
+        snapshot = generator.snapshot()
+        events = queue.Queue()
+
+        self.save_button.config(state=tk.DISABLED)
+        self.save_status.config(text=f"Saving {os.path.basename(file_path)}...")
+        self.save_progress.config(maximum=max(len(snapshot.ledger), 1), value=0)
+        self.save_progress.pack(before=self.save_status, pady=(0, 5))
+
+        self.save_worker = threading.Thread(
+            target=self._run_save_worker,
+            args=(generator, file_path, snapshot, events),
+            daemon=True
+        )
+        self.save_worker.start()
+        self.after(SAVE_POLL_MS, self._poll_save_events, events, generator, file_path, snapshot, window)
+
+    def _run_save_worker(self, generator, file_path, snapshot, events):
+        """Runs on the save thread. It only reads the snapshot; everything is passed back through the queue."""
+        def on_progress(phase, done, total):
+            events.put(('progress', phase, done, total))
+
+        try:
+            generator.write_file(file_path, snapshot, progress_callback=on_progress)
+            events.put(('done',))
+        except Exception as e:
+            events.put(('error', e))
+
+    def _poll_save_events(self, events, generator, file_path, snapshot, window):
+        """Drains the save thread's event queue on the Tk thread and updates the footer progress."""
+        while True:
+            try:
+                event = events.get_nowait()
+            except queue.Empty:
+                break
+
+            if event[0] == 'progress':
+                _, phase, done, total = event
+                self.save_progress.config(value=done)
+                if phase == 'save':
+                    self.save_status.config(text="Compressing workbook...")
+                else:
+                    self.save_status.config(text=f"Saving... {done:,} / {total:,} rows")
+                continue
+
+            # Any other event means the save thread has finished
+            self._finish_save(event, generator, file_path, snapshot, window)
+            return
+
+        self.after(SAVE_POLL_MS, self._poll_save_events, events, generator, file_path, snapshot, window)
+
+    def _finish_save(self, event, generator, file_path, snapshot, window):
+        """Handles the save thread's last event: ('done',) or ('error', exception)."""
+        self.save_worker = None
+        self.save_progress.pack_forget()
+        self.save_button.config(state=tk.NORMAL)
+        file_name = os.path.basename(file_path)
+
+        if event[0] == 'error':
+            self.save_status.config(text="")
+            messagebox.showerror("Save Error",
+                                 f"Failed to save {file_name}:\n{type(event[1]).__name__}: {event[1]}",
+                                 parent=window)
+            return
+
+        # The saved file becomes the recovery baseline; row IDs are renumbered to its row order
+        if not generator.finish_save(file_path, snapshot):
+            self.save_status.config(text="")
+            messagebox.showinfo("Success", f"File saved successfully to:\n{file_name}", parent=window)
+            self.close_excel_window(window) # Use the clean close method
+            return
+
+        # Edits came in while saving: the window stays open and the next save writes them too.
+        # The preview is rebound right away, since its items still hold the old row IDs.
+        self.close_cell_editor()
+        self.refresh_preview()
+        self.flush_preview_now()
+        window.title(f"Excel Data Entry & Live Preview - {file_name}")
+        self.save_status.config(text=f"Saved to {file_name}; changes made while saving are not saved yet")
 
     def generate_word_report_gui(self):
-        """Prompts for an Excel file and generates the Word report."""
+        """Prompts for an Excel file and generates the Word report on a background worker."""
+
+        # Only one report is generated at a time
+        if self.report_worker and self.report_worker.is_alive():
+            messagebox.showinfo("Busy", "A Word report is already being generated.")
+            return
         
         excel_file_path = filedialog.askopenfilename(
             defaultextension=".xlsx",
@@ -625,20 +1515,119 @@ class MainApplication(tk.Tk):
         if not excel_file_path:
             return # User cancelled selection
 
-        report_maker = WordReportGenerator()
-        
+        events = queue.Queue()
+        cancel_event = threading.Event()
+        self.report_phases = []
+
+        # --- Progress Window ---
+        progress_win = tk.Toplevel(self)
+        progress_win.title("Generating Word Report")
+        progress_win.resizable(False, False)
+        progress_win.protocol("WM_DELETE_WINDOW", cancel_event.set)
+
+        status_label = tk.Label(progress_win, text="Loading Excel file...", anchor="w", width=45)
+        status_label.pack(padx=10, pady=(10, 5), fill=tk.X)
+
+        progress_bar = ttk.Progressbar(progress_win, mode='indeterminate', length=300)
+        progress_bar.pack(padx=10, pady=5)
+        progress_bar.start(10)
+
+        def on_cancel():
+            cancel_event.set()
+            cancel_button.config(state=tk.DISABLED)
+            status_label.config(text="Cancelling...")
+
+        cancel_button = tk.Button(progress_win, text="Cancel", command=on_cancel)
+        cancel_button.pack(pady=(5, 10))
+
+        self.report_worker = threading.Thread(
+            target=self._run_report_worker,
+            args=(excel_file_path, events, cancel_event),
+            daemon=True
+        )
+        self.report_worker.start()
+        self.after(50, self._poll_report_events, events, progress_win, status_label, progress_bar)
+
+    def _run_report_worker(self, excel_file_path, events, cancel_event):
+        """Runs on the worker thread. Everything is passed back to the Tk loop through the queue."""
         try:
-            saved_doc_path = report_maker.generate_report(excel_file_path)
-            
-            messagebox.showinfo(
-                "Success", 
-                f"Word Report generated successfully!\nSaved as: {os.path.basename(saved_doc_path)}"
-            )
-        except (FileNotFoundError, ValueError) as e:
-            messagebox.showerror("Generation Error", str(e))
+            from word_report import WordReportGenerator, ReportCancelled
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to generate Word Report: {e}")
+            events.put(('error', e))
+            return
+
+        def on_progress(phase, done, total):
+            events.put(('progress', phase, done, total))
+
+        def on_span(span):
+            events.put(('span', span.name, span.seconds))
+
+        report_maker = WordReportGenerator(instrumentation=Instrumentation(on_span))
+
+        try:
+            saved_doc_path = report_maker.generate_report(excel_file_path, on_progress, cancel_event)
+            events.put(('done', saved_doc_path))
+        except ReportCancelled:
+            events.put(('cancelled',))
+        except Exception as e:
+            events.put(('error', e))
+
+    def _poll_report_events(self, events, progress_win, status_label, progress_bar):
+        """Drains the worker's event queue on the Tk thread and updates the progress window."""
+        phase_labels = {'read': "Rows read", 'write': "Rows written", 'save': "Saving document..."}
+
+        while True:
+            try:
+                event = events.get_nowait()
+            except queue.Empty:
+                break
+
+            kind = event[0]
+            if kind == 'progress':
+                _, phase, done, total = event
+                if str(progress_bar.cget('mode')) != 'determinate':
+                    progress_bar.stop()
+                    progress_bar.config(mode='determinate')
+                progress_bar.config(maximum=max(total, 1), value=done)
+                if phase == 'save':
+                    status_label.config(text=phase_labels[phase])
+                else:
+                    status_label.config(text=f"{phase_labels[phase]}: {done:,} / {total:,}")
+                continue
+            if kind == 'span':
+                self.report_phases.append((event[1], event[2]))
+                continue
+
+            # Any other event means the worker has finished
+            progress_win.destroy()
+            if kind == 'done':
+                timings = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.report_phases)
+                messagebox.showinfo(
+                    "Success", 
+                    f"Word Report generated successfully!\nSaved as: {os.path.basename(event[1])}"
+                    f"\n\nTimings: {timings}"
+                )
+            elif kind == 'cancelled':
+                messagebox.showinfo("Cancelled", "Word report generation was cancelled.")
+            elif isinstance(event[1], ImportError):
+                self.show_import_error(event[1])
+            elif isinstance(event[1], (FileNotFoundError, ValueError)):
+                messagebox.showerror("Generation Error", str(event[1]))
+            else:
+                messagebox.showerror("Error", f"Failed to generate Word Report: {event[1]}")
+            return
+
+        self.after(50, self._poll_report_events, events, progress_win, status_label, progress_bar)
             
+def prewarm_heavy_modules():
+    """Imports HEAVY_MODULES (runs on a background thread; Python's import lock makes this safe)."""
+    for module_name in HEAVY_MODULES:
+        try:
+            importlib.import_module(module_name)
+        except Exception:
+            # The failure is reported again where the module is actually used
+            pass
+
 # --- Main Execution Block ---
 if __name__ == "__main__":
     app = MainApplication()
@@ -0,0 +1,131 @@
+"""
+On-disk cache of generated Word reports, keyed by a content hash of the input workbook.
+
+Every entry is a pair of files in the cache directory: <key>.docx (a copy of the report) and
+<key>.json (metadata). The modification time of the .docx copy records its last use, which drives
+the age and size based eviction.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+
+from file_utils import atomic_save
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".financial_program", "report_cache")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_AGE_DAYS = 30
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+class ReportCache:
+    """Looks up and stores reports; hits and misses are counted per instance."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES,
+                 max_age_days=DEFAULT_MAX_AGE_DAYS):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_days * 24 * 60 * 60
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def make_key(self, excel_file_path, version, options):
+        """Hash of the workbook bytes plus the generator version and report options."""
+        digest = hashlib.sha256()
+        digest.update(json.dumps({"version": version, "options": options}, sort_keys=True).encode("utf-8"))
+        with open(excel_file_path, "rb") as excel_file:
+            for chunk in iter(lambda: excel_file.read(HASH_CHUNK_BYTES), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + ".docx", base + ".json"
+
+    def lookup(self, key, doc_name):
+        """
+        Returns doc_name if the cache has a report for key, restoring doc_name from the cached copy
+        when it is missing or was changed since it was generated. Returns None on a miss.
+        """
+        blob_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, encoding="utf-8") as meta_file:
+                meta = json.load(meta_file)
+            # A missing cached copy is a miss, not an error later on
+            os.stat(blob_path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        if not self._is_unchanged(doc_name, meta):
+            atomic_save(doc_name, lambda temp_path: shutil.copyfile(blob_path, temp_path))
+            self._write_meta(key, doc_name)
+
+        # Touch the cached copy: its mtime is the entry's last use
+        os.utime(blob_path, (time.time(), time.time()))
+        self.hits += 1
+        return doc_name
+
+    def store(self, key, doc_name):
+        """Copies a freshly generated report into the cache and evicts old entries."""
+        blob_path, _ = self._paths(key)
+        atomic_save(blob_path, lambda temp_path: shutil.copyfile(doc_name, temp_path))
+        self._write_meta(key, doc_name)
+        self.evict()
+
+    def _is_unchanged(self, doc_name, meta):
+        try:
+            doc_stat = os.stat(doc_name)
+        except OSError:
+            return False
+        return (os.path.abspath(doc_name) == meta.get("doc_path")
+                and doc_stat.st_size == meta.get("doc_size")
+                and doc_stat.st_mtime_ns == meta.get("doc_mtime_ns"))
+
+    def _write_meta(self, key, doc_name):
+        doc_stat = os.stat(doc_name)
+        meta = {
+            "doc_path": os.path.abspath(doc_name),
+            "doc_size": doc_stat.st_size,
+            "doc_mtime_ns": doc_stat.st_mtime_ns,
+            "created": time.time(),
+        }
+        _, meta_path = self._paths(key)
+
+        def write_meta(temp_path):
+            with open(temp_path, "w", encoding="utf-8") as meta_file:
+                json.dump(meta, meta_file)
+
+        atomic_save(meta_path, write_meta)
+
+    def evict(self):
+        """Removes entries unused for longer than max_age, then the least recently used above max_bytes."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".docx"):
+                continue
+            try:
+                blob_stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue  # Removed by another process in the meantime
+            entries.append((blob_stat.st_mtime, blob_stat.st_size, name[:-len(".docx")]))
+
+        now = time.time()
+        entries.sort()
+        total_bytes = sum(size for _, size, _ in entries)
+        for last_used, size, key in entries:
+            if now - last_used <= self.max_age_seconds and total_bytes <= self.max_bytes:
+                break
+            self._remove(key)
+            total_bytes -= size
+
+    def _remove(self, key):
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,221 @@
+"""
+Prebuilt report skeletons that are parsed once per process and cloned for every report.
+
+A skeleton is the fixed part of a report: the title heading, the date paragraph, the detail heading
+and the styled detail table with its header row. Building it with python-docx means loading the
+default template, resolving styles and creating the table for every report; here it is built once per
+header row and each report gets a copy. The copy only duplicates the main document part
+(word/document.xml); styles, theme, numbering and the other parts are shared read-only with the
+skeleton, so cloning takes a fraction of a millisecond.
+
+A user-supplied .docx (e.g. with company styles, logo and footer) can be used as the base. Its body may
+contain the placeholders below; whatever is missing is added at the end like in the default layout:
+
+    {{title}}  replaced by the report title (the source file name)
+    {{date}}   replaced by the report date (YYYY-MM-DD)
+    {{table}}  a paragraph of its own, replaced by the detail table
+
+The summary tables are inserted before the detail heading (default layout) or directly before the
+detail table (when the template has a {{table}} paragraph). A template does not need the 'Title',
+'Heading N' or 'Table Grid' styles of the default layout: missing heading styles become bold paragraphs
+and tables keep the template's default table style.
+"""
+
+import copy
+import datetime
+import os
+import threading
+
+from docx import Document
+from docx.opc.parts.coreprops import CorePropertiesPart
+from docx.oxml import OxmlElement
+from docx.parts.document import DocumentPart
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+
+TITLE_PLACEHOLDER = "{{title}}"
+DATE_PLACEHOLDER = "{{date}}"
+TABLE_PLACEHOLDER = "{{table}}"
+
+# Text of the default layout (the same as the reports built before templates existed)
+DEFAULT_TITLE_TEXT = f"Report Generated from: {TITLE_PLACEHOLDER}"
+DEFAULT_DATE_TEXT = f"Report Date: {DATE_PLACEHOLDER}"
+DETAIL_HEADING_TEXT = "Data Summary Table"
+
+TABLE_STYLE = "Table Grid"
+
+
+class _Skeleton:
+    """One parsed skeleton package plus the body positions of everything filled in per report."""
+    __slots__ = ('package', 'shared_parts', 'placeholder_positions', 'anchor_position', 'table_position')
+
+    def __init__(self, document, placeholder_positions, anchor_position, table_position):
+        # Only the package is kept: python-docx proxies (Document, _Body, ...) hold sub-elements,
+        # which deepcopy would copy into detached trees
+        self.package = document.part.package
+        # Parts that are never changed per report, so clones can share them
+        self.shared_parts = [part for part in self.package.iter_parts()
+                             if not isinstance(part, (DocumentPart, CorePropertiesPart))]
+        self.placeholder_positions = placeholder_positions
+        self.anchor_position = anchor_position
+        self.table_position = table_position
+
+
+class ReportTemplate:
+    """
+    Builds a skeleton per header row on first use and hands out cheap copies of it.
+    template_path=None uses python-docx's default template. Safe to share between threads.
+    """
+
+    def __init__(self, template_path=None):
+        if template_path is not None and not os.path.exists(template_path):
+            raise FileNotFoundError(f"Report template not found: {template_path}")
+        self.template_path = template_path
+        self._skeletons = {}
+        self._lock = threading.Lock()
+        # Styles used by add_heading/add_table, looked up in the template when the first skeleton is built
+        self._heading_levels = None
+        self._table_style = None
+
+    @property
+    def cache_token(self):
+        """Identifies the template in report cache keys (None for the default layout)."""
+        if self.template_path is None:
+            return None
+        template_stat = os.stat(self.template_path)
+        return f"{os.path.abspath(self.template_path)}:{template_stat.st_size}:{template_stat.st_mtime_ns}"
+
+    def new_report(self, title, headers, date=None):
+        """
+        Returns (document, summary anchor, detail table) for a new report. The summary tables belong
+        in front of the anchor (a Paragraph or the Table itself); the table holds only the header row.
+        """
+        skeleton = self._skeleton(tuple(str(header) for header in headers))
+
+        # deepcopy with the shared parts pre-seeded in the memo copies only the main document part
+        package = copy.deepcopy(skeleton.package, {id(part): part for part in skeleton.shared_parts})
+        document = package.main_document_part.document
+        body = document._body
+        children = list(body._element)
+
+        values = {TITLE_PLACEHOLDER: str(title),
+                  DATE_PLACEHOLDER: (date or datetime.date.today()).strftime('%Y-%m-%d')}
+        for position in skeleton.placeholder_positions:
+            _fill_placeholders(Paragraph(children[position], body), values)
+
+        table = Table(children[skeleton.table_position], body)
+        if skeleton.anchor_position == skeleton.table_position:
+            return document, table, table
+        return document, Paragraph(children[skeleton.anchor_position], body), table
+
+    def new_master(self, title, headers, date=None):
+        """
+        Returns (document, anchor) for the master document of a multi-part report: a report whose detail
+        table (and detail heading, in the default layout) is replaced by the anchor, an empty paragraph
+        marking where the part list goes. The caller removes the anchor once the list is in place.
+        """
+        document, summary_anchor, table = self.new_report(title, headers, date)
+        anchor = Paragraph(OxmlElement('w:p'), table._parent)
+        table._tbl.addprevious(anchor._p)
+        table._tbl.getparent().remove(table._tbl)
+        if summary_anchor is not table:
+            summary_anchor._p.getparent().remove(summary_anchor._p)
+        return document, anchor
+
+    def add_heading(self, document, text, level):
+        """document.add_heading, or a bold paragraph if the template has no style for that level."""
+        if level in self._heading_levels:
+            return document.add_heading(text, level)
+        paragraph = document.add_paragraph()
+        paragraph.add_run(text).bold = True
+        return paragraph
+
+    def add_table(self, document, rows, cols):
+        """document.add_table with the 'Table Grid' style when the template has it."""
+        table = document.add_table(rows=rows, cols=cols)
+        if self._table_style is not None:
+            table.style = self._table_style
+        return table
+
+    def _resolve_styles(self, document):
+        style_names = {style.name for style in document.styles}
+        self._heading_levels = frozenset(level for level in range(10)
+                                         if ("Title" if level == 0 else f"Heading {level}") in style_names)
+        self._table_style = TABLE_STYLE if TABLE_STYLE in style_names else None
+
+    def _skeleton(self, headers):
+        skeleton = self._skeletons.get(headers)
+        if skeleton is None:
+            with self._lock:
+                skeleton = self._skeletons.get(headers)
+                if skeleton is None:
+                    skeleton = self._skeletons[headers] = self._build_skeleton(headers)
+        return skeleton
+
+    def _build_skeleton(self, headers):
+        document = Document(self.template_path)
+        if self._heading_levels is None:
+            self._resolve_styles(document)
+
+        def find(placeholder):
+            return next((paragraph for paragraph in document.paragraphs if placeholder in paragraph.text), None)
+
+        if find(TITLE_PLACEHOLDER) is None:
+            self.add_heading(document, DEFAULT_TITLE_TEXT, 0)
+        if find(DATE_PLACEHOLDER) is None:
+            document.add_paragraph(DEFAULT_DATE_TEXT)
+        table_paragraph = find(TABLE_PLACEHOLDER)
+        detail_heading = None
+        if table_paragraph is None:
+            detail_heading = self.add_heading(document, DETAIL_HEADING_TEXT, level=1)
+
+        # Create the detail table with its header row
+        table = self.add_table(document, rows=1, cols=len(headers))
+        for cell, header in zip(table.rows[0].cells, headers):
+            cell.text = header
+
+        if table_paragraph is not None:
+            # Move the table into the placeholder's place
+            table_paragraph._p.addnext(table._tbl)
+            table_paragraph._p.getparent().remove(table_paragraph._p)
+
+        children = list(document.element.body)
+        placeholder_positions = [children.index(paragraph._p) for paragraph in document.paragraphs
+                                 if TITLE_PLACEHOLDER in paragraph.text or DATE_PLACEHOLDER in paragraph.text]
+        table_position = children.index(table._tbl)
+        anchor_position = table_position if detail_heading is None else children.index(detail_heading._p)
+        return _Skeleton(document, placeholder_positions, anchor_position, table_position)
+
+
+def _fill_placeholders(paragraph, values):
+    """Replaces the placeholders in a paragraph, keeping the run formatting where possible."""
+    for run in paragraph.runs:
+        text = run.text
+        if "{{" in text:
+            for placeholder, value in values.items():
+                text = text.replace(placeholder, value)
+            run.text = text
+
+    # Word sometimes splits a placeholder over several runs; then the text goes into the first run
+    if any(placeholder in paragraph.text for placeholder in values):
+        text = paragraph.text
+        for placeholder, value in values.items():
+            text = text.replace(placeholder, value)
+        runs = paragraph.runs
+        runs[0].text = text
+        for run in runs[1:]:
+            run._r.getparent().remove(run._r)
+
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+def get_report_template(template_path=None):
+    """The process-wide ReportTemplate for template_path, so each template is parsed once per process."""
+    key = None if template_path is None else os.path.abspath(template_path)
+    with _templates_lock:
+        template = _templates.get(key)
+        if template is None:
+            template = _templates[key] = ReportTemplate(template_path)
+        return template
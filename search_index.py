@@ -0,0 +1,255 @@
+"""
+Incrementally maintained search index for the preview filter (부서/항목 text and amount range).
+
+For every text column the index keeps one posting array per distinct value (the TextColumn code):
+the storage positions of the rows holding that value. A text query is matched against the distinct
+values only, so its cost depends on the number of distinct 부서/항목 values and matching rows, not on
+the ledger size. Adds append to the postings; edits append to the new value's posting and leave the
+old entry behind. Every read checks each row's current value, so the old entry is dropped the next
+time the old value's posting is read.
+
+For each amount column the index keeps the non-zero amounts sorted, so an amount range is two binary
+searches. Edits and adds go to a short pending list until it is worth re-sorting.
+
+Deleted rows are skipped using the ledger's live flags, and matches are put into display order with
+the ledger's rank map (Ledger.display_sorted), so no query walks all rows.
+
+Hangul text is compared as basic jamo (닭 -> ㄷㅏㄹㄱ), so a partially typed syllable such as "촘"
+already matches "초무...", and a query made only of initial consonants (ㅊㅁㅂ) matches 총무부.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import compress
+
+HANGUL_FIRST = 0xAC00
+HANGUL_LAST = 0xD7A3
+
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSEONG = ("ㅏ", "ㅐ", "ㅑ", "ㅒ", "ㅓ", "ㅔ", "ㅕ", "ㅖ", "ㅗ", "ㅗㅏ", "ㅗㅐ", "ㅗㅣ", "ㅛ", "ㅜ",
+             "ㅜㅓ", "ㅜㅔ", "ㅜㅣ", "ㅠ", "ㅡ", "ㅡㅣ", "ㅣ")
+JONGSEONG = ("", "ㄱ", "ㄲ", "ㄱㅅ", "ㄴ", "ㄴㅈ", "ㄴㅎ", "ㄷ", "ㄹ", "ㄹㄱ", "ㄹㅁ", "ㄹㅂ", "ㄹㅅ", "ㄹㅌ",
+             "ㄹㅍ", "ㄹㅎ", "ㅁ", "ㅂ", "ㅂㅅ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ")
+
+# Compound jamo typed on their own (e.g. while composing) are split the same way
+COMPOUND_JAMO = {"ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+                 "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ", "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ",
+                 "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ"}
+
+CONSONANTS = frozenset(CHOSEONG)
+
+
+def decompose_hangul(text):
+    """Lower-cases text and splits Hangul syllables and compound jamo into basic jamo."""
+    parts = []
+    for char in text.lower():
+        code = ord(char)
+        if HANGUL_FIRST <= code <= HANGUL_LAST:
+            offset = code - HANGUL_FIRST
+            parts.append(CHOSEONG[offset // 588])
+            parts.append(JUNGSEONG[(offset % 588) // 28])
+            parts.append(JONGSEONG[offset % 28])
+        else:
+            parts.append(COMPOUND_JAMO.get(char, char))
+    return "".join(parts)
+
+
+def hangul_initials(text):
+    """The initial consonant of every Hangul syllable (총무부 -> ㅊㅁㅂ); other characters are kept."""
+    return "".join(CHOSEONG[(ord(char) - HANGUL_FIRST) // 588] if HANGUL_FIRST <= ord(char) <= HANGUL_LAST
+                   else char for char in text.lower())
+
+
+class _TextColumnIndex:
+    """Postings and search keys for one TextColumn, indexed by the column's value codes."""
+    __slots__ = ('column', 'postings', 'dirty', 'keys', 'initials')
+
+    def __init__(self, column):
+        self.column = column
+        self.postings = []   # code -> array of storage positions (may hold entries of rows edited since)
+        self.dirty = []      # code -> True if the posting is unsorted or has duplicate entries
+        self.keys = []       # code -> decomposed search key
+        self.initials = []   # code -> initial consonants
+
+    def _grow(self):
+        """Adds postings and search keys for distinct values that appeared since the last call."""
+        values = self.column.values
+        for code in range(len(self.keys), len(values)):
+            value = str(values[code])
+            self.postings.append(array('q'))
+            self.dirty.append(False)
+            self.keys.append(decompose_hangul(value))
+            self.initials.append(hangul_initials(value))
+
+    def add_positions(self, start, end):
+        self._grow()
+        codes = self.column.codes
+        postings = self.postings
+        for position in range(start, end):
+            postings[codes[position]].append(position)
+
+    def update_position(self, position):
+        self._grow()
+        code = self.column.codes[position]
+        self.postings[code].append(position)
+        self.dirty[code] = True
+
+    def matching_codes(self, key, initials_only):
+        self._grow()
+        if initials_only:
+            return [code for code, (initials, value_key) in enumerate(zip(self.initials, self.keys))
+                    if key in initials or key in value_key]
+        return [code for code, value_key in enumerate(self.keys) if key in value_key]
+
+    def positions(self, code, live):
+        """Valid positions holding the value, in storage order. The posting is cleaned up on the way."""
+        posting = self.postings[code]
+        if self.dirty[code]:
+            # Rows were edited to this value: the posting is unsorted and may hold duplicates
+            posting = array('q', sorted(set(posting)))
+            self.dirty[code] = False
+        # Rows edited to another value are still listed here; their entries are dropped now
+        codes = self.column.codes
+        current = [position for position in posting if codes[position] == code]
+        if len(current) != len(posting):
+            posting = array('q', current)
+        self.postings[code] = posting
+        return [position for position in current if live[position]]
+
+
+# The sorted amount index is rebuilt when the pending list grows beyond this or 1/16 of the index
+AMOUNT_PENDING_MIN = 1024
+
+
+class _AmountColumnIndex:
+    """
+    The non-zero amounts of one amount column, sorted, with their storage positions. Built on the first
+    range query. Edited and added rows go to a pending list (scanned linearly) until it is re-sorted.
+    """
+    __slots__ = ('ledger', 'column_index', 'amounts', 'positions', 'pending')
+
+    def __init__(self, ledger, column_index):
+        self.ledger = ledger
+        self.column_index = column_index
+        self.amounts = None    # Sorted non-zero amounts (None until built)
+        self.positions = None  # Storage position of each amount
+        self.pending = []      # (amount, position) added or edited since the build
+
+    def _build(self):
+        column = self.ledger.amount_columns[self.column_index]
+        positions = sorted(compress(range(len(column)), column), key=column.__getitem__)
+        self.positions = array('q', positions)
+        self.amounts = array('q', map(column.__getitem__, positions))
+        self.pending = []
+
+    def add_positions(self, start, end):
+        """Notes new or edited amounts. Entries made stale by edits are dropped when they are read."""
+        if self.amounts is None:
+            return  # The first query builds the index from the current column
+        limit = max(AMOUNT_PENDING_MIN, len(self.amounts) >> 4)
+        if len(self.pending) + end - start > limit:
+            # Cheaper to sort everything again on the next query
+            self.amounts = self.positions = None
+            self.pending = []
+            return
+        column = self.ledger.amount_columns[self.column_index]
+        self.pending.extend((column[position], position) for position in range(start, end) if column[position])
+
+    def positions_between(self, low, high, live):
+        """Storage positions of the live rows with a non-zero amount in [low, high] (unordered, may repeat)."""
+        if self.amounts is None:
+            self._build()
+        column = self.ledger.amount_columns[self.column_index]
+        start = bisect_left(self.amounts, low)
+        end = bisect_right(self.amounts, high)
+        found = [position for amount, position in zip(self.amounts[start:end], self.positions[start:end])
+                 if live[position] and column[position] == amount]
+        found.extend(position for amount, position in self.pending
+                     if low <= amount <= high and live[position] and column[position] == amount)
+        return found
+
+
+class LedgerSearchIndex:
+    """
+    Search index over a Ledger. ExcelGenerator calls add_rows() after every append and update_row()
+    after every cell edit; search() then never rescans the text columns.
+    """
+
+    def __init__(self, ledger):
+        self.ledger = ledger
+        self.text_indexes = [_TextColumnIndex(column) for column in ledger.text_columns]
+        self.amount_indexes = [_AmountColumnIndex(ledger, index) for index in range(len(ledger.amount_columns))]
+        self.add_rows(range(1, len(ledger.live) + 1))
+
+    def add_rows(self, row_ids):
+        """Indexes newly appended rows (a contiguous range of row IDs)."""
+        if not row_ids:
+            return
+        for text_index in self.text_indexes:
+            text_index.add_positions(row_ids[0] - 1, row_ids[-1])
+        for amount_index in self.amount_indexes:
+            amount_index.add_positions(row_ids[0] - 1, row_ids[-1])
+
+    def update_row(self, row_id, column_index):
+        """Re-indexes one cell after it was overwritten."""
+        text_count = len(self.text_indexes)
+        if column_index < text_count:
+            self.text_indexes[column_index].update_position(row_id - 1)
+        else:
+            self.amount_indexes[column_index - text_count].add_positions(row_id - 1, row_id)
+
+    def search(self, text="", min_amount=None, max_amount=None):
+        """
+        Returns the row IDs, in display order, of the rows whose 부서 or 항목 contains text and whose
+        non-zero 입금 or 출금 lies within [min_amount, max_amount]. None means no bound; a zero amount
+        means "no entry" and never matches a range.
+        """
+        ledger = self.ledger
+        query = text.strip()
+        if query:
+            positions = self._text_positions(query)
+        else:
+            positions = None
+
+        if min_amount is not None or max_amount is not None:
+            positions = self._filter_amounts(positions, min_amount, max_amount)
+
+        if positions is None:
+            return [position + 1 for position in ledger.order]
+        if not ledger.in_storage_order:
+            # Rows were sorted or deleted: order the matches by their display rank
+            positions = ledger.display_sorted(positions)
+        return [position + 1 for position in positions]
+
+    def _text_positions(self, query):
+        """Storage positions (sorted) of the live rows whose text columns match the query."""
+        key = decompose_hangul(query)
+        initials_only = all(char in CONSONANTS for char in key)
+        live = self.ledger.live
+
+        chunks = []
+        for text_index in self.text_indexes:
+            for code in text_index.matching_codes(key, initials_only):
+                chunks.append(text_index.positions(code, live))
+        if len(chunks) == 1:
+            return chunks[0]
+        # A row can match in more than one column
+        if len(self.text_indexes) > 1:
+            return sorted({position for chunk in chunks for position in chunk})
+        return sorted(position for chunk in chunks for position in chunk)
+
+    def _filter_amounts(self, positions, min_amount, max_amount):
+        low = -2**63 if min_amount is None else min_amount
+        high = 2**63 - 1 if max_amount is None else max_amount
+        deposits, withdrawals = self.ledger.amount_columns
+
+        if positions is None:
+            # No text term: binary searches in the sorted amount indexes
+            live = self.ledger.live
+            found = set()
+            for amount_index in self.amount_indexes:
+                found.update(amount_index.positions_between(low, high, live))
+            return sorted(found)
+        return [position for position in positions
+                if (deposits[position] and low <= deposits[position] <= high)
+                or (withdrawals[position] and low <= withdrawals[position] <= high)]
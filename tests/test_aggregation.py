@@ -0,0 +1,57 @@
+import os
+import random
+import sys
+from decimal import Decimal
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aggregation
+from aggregation import LedgerAggregator
+
+np = pytest.importorskip("numpy")
+
+HEADERS = ("부서", "항목", "입금", "출금")
+
+
+def totals(aggregator):
+    def as_tuples(groups):
+        return {key: (group.count, group.deposit, group.withdrawal) for key, group in groups.items()}
+    overall = aggregator.overall
+    return (as_tuples(aggregator.by_dept), as_tuples(aggregator.by_entry),
+            (overall.count, overall.deposit, overall.withdrawal))
+
+
+def aggregate(rows, use_numpy):
+    aggregator = LedgerAggregator(HEADERS, use_numpy=use_numpy)
+    aggregator.add_rows(rows)
+    return totals(aggregator.finish())
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(aggregation, "NUMPY_CHUNK_ROWS", 50)
+
+
+def test_numpy_matches_python_on_mixed_cells(small_chunks):
+    random.seed(7)
+    cells = [0, 1, -3, 1250000, 2**53 + 1, None, "", "1,250", "₩3,000", "12.50", "(500)", "x", 12.5,
+             Decimal("0.01"), True]
+    rows = [(random.choice(["총무부", "영업부", None]), random.choice(["비품", "식대", 3]),
+             random.choice(cells), random.choice(cells)) for _ in range(1000)]
+    assert aggregate(rows, use_numpy=True) == aggregate(rows, use_numpy=False)
+
+
+def test_numpy_matches_python_on_whole_amounts(small_chunks):
+    random.seed(8)
+    rows = [(f"부서{index % 7}", f"항목{index % 11}", random.randint(-10**12, 10**12), random.randint(0, 10**6))
+            for index in range(1000)]
+    assert aggregate(rows, use_numpy=True) == aggregate(rows, use_numpy=False)
+
+
+def test_numpy_falls_back_when_int64_could_overflow(small_chunks):
+    rows = [("총무부", "비품", 2**62, 0), ("총무부", "비품", 2**62, "10"), ("영업부", "식대", 10**30, 1)]
+    result = aggregate(rows, use_numpy=True)
+    assert result == aggregate(rows, use_numpy=False)
+    assert result[0]["총무부"] == (2, 2**63 * 100, 1000)
@@ -0,0 +1,59 @@
+import os
+import sys
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from amount import BULK_CHUNK_ROWS, Amount, parse_amount, parse_amount_column, to_minor
+
+EDGE_CASES = [
+    "", " ", "0", "1250000", "1,250,000", "₩3,000", "3,000원", "USD 12.50", "12.50", "12.5", "-12.50",
+    "+12.50", "(1,000)", "1,000-", ".5", ".50", "-.5", "+.50", "5.", ".", ".-5", ".+5", ".-", "-", "+",
+    "--5.50", "+-5.50", "1.234", "1.2.3", "12.5a", "a.50", "abc", "₩", "1_0.50", "٥.٥", "9" * 30,
+    "92233720368547758.07", "92233720368547758.08", "-92233720368547758.08", "(-5)",
+]
+
+
+def expected(value):
+    try:
+        return parse_amount(value)
+    except ValueError:
+        return None
+
+
+def test_bulk_parser_matches_parse_amount():
+    for value in EDGE_CASES:
+        # Alone (fast path) and next to a non-text value (value-by-value path)
+        assert parse_amount_column([value])[0] == [expected(value)], value
+        assert parse_amount_column([value, 1])[0] == [expected(value), 100], value
+
+
+def test_bulk_parser_errors_by_position():
+    values = ["1,000"] * (BULK_CHUNK_ROWS + 10)
+    values[3] = ".-5"
+    values[BULK_CHUNK_ROWS + 2] = "12.5a"
+    parsed, errors = parse_amount_column(values)
+    assert len(parsed) == len(values)
+    assert set(errors) == {3, BULK_CHUNK_ROWS + 2}
+    assert parsed[3] is None and parsed[4] == 100000
+
+
+def test_bulk_parser_plain_chunks():
+    values = [f"{index:,}.{index % 100:02d}" for index in range(5000)]
+    assert parse_amount_column(values)[0] == [parse_amount(value) for value in values]
+
+
+def test_amount_is_not_scaled_again():
+    amount = Amount.parse("12.50")
+    assert parse_amount(amount) == 1250
+    assert to_minor(amount) == 1250
+    assert parse_amount_column([amount, "1"])[0] == [1250, 100]
+    assert str(amount) == "12.50"
+
+
+def test_other_cell_types():
+    assert parse_amount(12) == 1200
+    assert parse_amount(12.5) == 1250
+    assert parse_amount(Decimal("0.01")) == 1
+    assert parse_amount(None) == 0
+    assert expected(True) is None
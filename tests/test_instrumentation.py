@@ -0,0 +1,60 @@
+import os
+import sys
+import tracemalloc
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from instrumentation import Instrumentation
+
+BLOCK = 4 * 2**20
+
+
+@pytest.fixture
+def tracing():
+    tracemalloc.start()
+    yield
+    tracemalloc.stop()
+
+
+def test_spans_leave_the_global_peak_alone(tracing):
+    block = bytearray(BLOCK)
+    del block
+    outer_peak = tracemalloc.get_traced_memory()[1]
+    instrumentation = Instrumentation()
+    with instrumentation.span('small'):
+        pass
+    # A caller measuring around the spans (like benchmark.run_once) still sees its own peak
+    assert tracemalloc.get_traced_memory()[1] >= outer_peak
+
+
+def test_overlapping_spans_see_a_new_peak(tracing):
+    instrumentation = Instrumentation()
+    outer = instrumentation.begin('outer')
+    inner = instrumentation.begin('inner')
+    block = bytearray(2 * BLOCK)
+    del block
+    instrumentation.end(inner)
+    instrumentation.end(outer)
+    for span in (inner, outer):
+        assert span.peak_memory_exact
+        assert span.peak_memory_delta >= 2 * BLOCK
+
+
+def test_span_below_an_earlier_peak_is_a_lower_bound(tracing):
+    block = bytearray(2 * BLOCK)
+    del block
+    instrumentation = Instrumentation()
+    with instrumentation.span('later') as span:
+        kept = bytearray(BLOCK)
+    assert not span.peak_memory_exact
+    assert BLOCK <= span.peak_memory_delta < 2 * BLOCK
+    del kept
+
+
+def test_no_memory_without_tracing():
+    with Instrumentation().span('untraced') as span:
+        pass
+    assert span.peak_memory_delta is None and span.peak_memory_exact is None
+    assert span.to_dict()["span"] == 'untraced'
@@ -0,0 +1,110 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from excel_generator import ExcelGenerator
+from journal import EditJournal
+
+HEADERS = ("부서", "항목", "입금", "출금")
+
+
+def rows_of(generator):
+    return [(generator.row_id_at(index),) + tuple(map(str, generator.get_data_row(index)))
+            for index in range(1, generator.get_row_count() + 1)]
+
+
+def make_session(tmp_path):
+    journal = EditJournal(str(tmp_path / "session.journal"))
+    generator = ExcelGenerator(HEADERS)
+    generator.attach_journal(journal)
+    return generator, journal
+
+
+def test_replay_reproduces_the_session(tmp_path):
+    generator, journal = make_session(tmp_path)
+    generator.add_data_row("총무부", "비품", "1,000", "0")
+    generator.import_rows([["영업부", "출장", "2000", "0"], ["인사부", "교육", "0", "12.50"]], [2, 3])
+    generator.update_cell(1, "입금", "1500")
+    generator.delete_row(2)
+    generator.sort_rows("출금", reverse=True)
+    generator.add_data_row("재무부", "이자", "30", "0")
+    journal.close()
+
+    recovered = ExcelGenerator(HEADERS)
+    assert EditJournal(journal.path).replay(recovered) == 6
+    assert rows_of(recovered) == rows_of(generator)
+
+
+def test_replay_rejects_other_columns(tmp_path):
+    generator, journal = make_session(tmp_path)
+    generator.add_data_row("총무부", "비품", "1000", "0")
+    journal.close()
+    try:
+        journal.replay(ExcelGenerator(("부서", "내용", "입금", "출금")))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("replay accepted a journal for different columns")
+
+
+def test_torn_last_line_is_ignored_and_cut_off(tmp_path):
+    generator, journal = make_session(tmp_path)
+    generator.add_data_row("총무부", "비품", "1000", "0")
+    journal.close()
+    with open(journal.path, "a", encoding="utf-8") as journal_file:
+        journal_file.write('{"op": "add", "values": ["영업')
+
+    assert [record["op"] for record in journal.read_records()] == ["start", "add"]
+
+    # Continuing the journal cuts off the torn record, so the next record starts on a clean line
+    recovered = ExcelGenerator(HEADERS)
+    journal.replay(recovered)
+    recovered.attach_journal(journal, keep_existing=True)
+    recovered.add_data_row("영업부", "출장", "2000", "0")
+    journal.close()
+
+    assert [record["op"] for record in journal.read_records()] == ["start", "add", "add"]
+    replayed = ExcelGenerator(HEADERS)
+    journal.replay(replayed)
+    assert rows_of(replayed) == rows_of(recovered)
+
+
+def test_records_since_mark(tmp_path):
+    generator, journal = make_session(tmp_path)
+    generator.add_data_row("총무부", "비품", "1000", "0")
+    mark = journal.mark()
+    generator.update_cell(1, "항목", "소모품")
+    generator.delete_row(1)
+
+    assert journal.records_since(mark) == [
+        {"op": "update", "id": 1, "col": "항목", "value": "소모품"},
+        {"op": "delete", "id": 1},
+    ]
+
+
+def test_compact_keeps_only_start_and_kept_records(tmp_path):
+    generator, journal = make_session(tmp_path)
+    generator.add_data_row("총무부", "비품", "1000", "0")
+    kept = [{"op": "delete", "id": 1}]
+    journal.compact(HEADERS, source_path=str(tmp_path / "saved.xlsx"), keep_records=kept)
+
+    records = journal.read_records()
+    assert records[0] == {"op": "start", "headers": list(HEADERS), "source": str(tmp_path / "saved.xlsx")}
+    assert records[1:] == kept
+    assert journal.has_unsaved_edits()
+
+    journal.compact(HEADERS)
+    assert not journal.has_unsaved_edits()
+
+
+def test_set_aside_keeps_the_records(tmp_path):
+    generator, journal = make_session(tmp_path)
+    generator.add_data_row("총무부", "비품", "1000", "0")
+    records = journal.read_records()
+
+    backup_path = journal.set_aside()
+    assert not os.path.exists(journal.path)
+    assert backup_path.endswith(".failed")
+    assert EditJournal(backup_path).read_records() == records
+    assert journal.set_aside() is None
@@ -0,0 +1,110 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ledger as ledger_module
+from ledger import Ledger
+
+HEADERS = ("부서", "항목", "입금", "출금")
+
+
+def make_ledger(count):
+    ledger = Ledger(HEADERS)
+    for index in range(count):
+        ledger.append_row([f"부서{index % 5}", f"항목{index % 7}", index * 100, 0])
+    return ledger
+
+
+def check(ledger, model):
+    """model is the list of row IDs in display order."""
+    assert len(ledger) == len(model)
+    assert [ledger.row_id_at(index) for index in range(len(model))] == model
+    if model:
+        assert ledger.row_id_at(-1) == model[-1]
+    assert [position + 1 for position in ledger.order] == model
+
+
+def test_row_ids_survive_deletes_and_sorts(monkeypatch):
+    monkeypatch.setattr(ledger_module, "PURGE_DELETED_ROWS", 8)
+    random.seed(3)
+    ledger = make_ledger(200)
+    model = list(range(1, 201))
+    values = {row_id: ledger.get_row(row_id) for row_id in model}
+
+    for step in range(300):
+        action = random.random()
+        if action < 0.6 and model:
+            row_id = random.choice(model)
+            ledger.delete_row(row_id)
+            model.remove(row_id)
+        elif action < 0.7:
+            reverse = random.random() < 0.5
+            ledger.sort(2, reverse=reverse)
+            model.sort(key=lambda row_id: values[row_id][2], reverse=reverse)
+        elif action < 0.85:
+            row_id = ledger.append_row([f"부서{step}", "추가", step, 1])
+            values[row_id] = ledger.get_row(row_id)
+            model.append(row_id)
+        elif model:
+            row_id = random.choice(model)
+            ledger.set_value(row_id, 0, "수정")
+            values[row_id] = ledger.get_row(row_id)
+        if step % 10 == 0:
+            check(ledger, model)
+            for row_id in random.sample(model, min(5, len(model))):
+                assert ledger.get_row(row_id) == values[row_id]
+    check(ledger, model)
+
+
+def test_display_sorted_follows_the_order():
+    ledger = make_ledger(50)
+    for row_id in (3, 10, 11, 40):
+        ledger.delete_row(row_id)
+    assert ledger.display_sorted([20, 5, 1]) == [1, 5, 20]
+    ledger.sort(2, reverse=True)
+    assert ledger.display_sorted([20, 5, 1]) == [20, 5, 1]
+    ledger.delete_row(30)
+    ledger.append_row(["새", "행", 10**6, 0])
+    # Rows added after a sort are shown at the end
+    assert ledger.display_sorted([50, 20, 5]) == [20, 5, 50]
+
+
+def test_deleted_rows_are_gone_and_ids_are_not_reused():
+    ledger = make_ledger(10)
+    ledger.delete_row(4)
+    try:
+        ledger.get_row(4)
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("a deleted row must not be readable")
+    assert ledger.append_row(["a", "b", 1, 0]) == 11
+    assert ledger.compact()
+    assert [ledger.row_id_at(index) for index in range(len(ledger))] == list(range(1, 11))
+    assert ledger.get_row(10) == ["a", "b", 1, 0]
+
+
+def test_copy_is_independent():
+    ledger = make_ledger(10)
+    ledger.delete_row(2)
+    clone = ledger.copy()
+    ledger.delete_row(3)
+    assert len(clone) == 9 and len(ledger) == 8
+    assert clone.row_id_at(1) == 3
+
+
+def test_rebase_with_rows_deleted_since_the_snapshot():
+    ledger = make_ledger(6)
+    ledger.sort(2, reverse=True)
+    snapshot = ledger.copy()
+    ledger.delete_row(6)
+    ledger.append_row(["새", "행", 7, 0])
+    expected = [ledger.get_row(ledger.row_id_at(index)) for index in range(len(ledger))]
+
+    positions = list(snapshot.order) + list(range(len(snapshot.live), len(ledger.live)))
+    id_map = ledger.rebase(positions)
+    assert id_map[7] == 7 and id_map[5] == 2
+    assert [ledger.row_id_at(index) for index in range(len(ledger))] == [2, 3, 4, 5, 6, 7]
+    assert [ledger.get_row(ledger.row_id_at(index)) for index in range(len(ledger))] == expected
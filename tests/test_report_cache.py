@@ -0,0 +1,85 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from report_cache import ReportCache
+
+
+def write(path, data):
+    with open(path, "wb") as output:
+        output.write(data)
+
+
+def read(path):
+    with open(path, "rb") as source:
+        return source.read()
+
+
+def test_key_covers_content_version_and_options(tmp_path):
+    cache = ReportCache(str(tmp_path / "cache"))
+    workbook = str(tmp_path / "ledger.xlsx")
+    write(workbook, b"rows")
+    key = cache.make_key(workbook, 1, {"summary": True})
+
+    assert cache.make_key(workbook, 1, {"summary": True}) == key
+    assert cache.make_key(workbook, 2, {"summary": True}) != key
+    assert cache.make_key(workbook, 1, {"summary": False}) != key
+    write(workbook, b"other rows")
+    assert cache.make_key(workbook, 1, {"summary": True}) != key
+
+
+def test_hit_restores_a_changed_or_missing_report(tmp_path):
+    cache = ReportCache(str(tmp_path / "cache"))
+    doc_name = str(tmp_path / "ledger_Report.docx")
+    assert cache.lookup("key", doc_name) is None
+    assert cache.misses == 1
+
+    write(doc_name, b"report")
+    cache.store("key", doc_name)
+    assert cache.lookup("key", doc_name) == doc_name
+    assert cache.hits == 1
+
+    write(doc_name, b"edited in Word")
+    assert cache.lookup("key", doc_name) == doc_name
+    assert read(doc_name) == b"report"
+
+    os.remove(doc_name)
+    assert cache.lookup("key", doc_name) == doc_name
+    assert read(doc_name) == b"report"
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_missing_cached_copy_is_a_miss(tmp_path):
+    cache = ReportCache(str(tmp_path / "cache"))
+    doc_name = str(tmp_path / "ledger_Report.docx")
+    write(doc_name, b"report")
+    cache.store("key", doc_name)
+    os.remove(os.path.join(cache.cache_dir, "key.docx"))
+
+    assert cache.lookup("key", doc_name) is None
+    assert cache.misses == 1
+
+
+def test_eviction_by_age_and_size(tmp_path):
+    cache = ReportCache(str(tmp_path / "cache"), max_age_days=1)
+    doc_name = str(tmp_path / "report.docx")
+    now = time.time()
+    for hours_ago, key in ((3, "first"), (2, "second"), (1, "third")):
+        write(doc_name, bytes(100))
+        cache.store(key, doc_name)
+        blob_path = os.path.join(cache.cache_dir, key + ".docx")
+        os.utime(blob_path, (now - 3600 * hours_ago, now - 3600 * hours_ago))
+    # A lookup makes an entry the most recently used one
+    assert cache.lookup("first", doc_name) == doc_name
+
+    cache.max_bytes = 250
+    cache.evict()
+    remaining = sorted(name for name in os.listdir(cache.cache_dir) if name.endswith(".docx"))
+    assert remaining == ["first.docx", "third.docx"]
+
+    stale = os.path.join(cache.cache_dir, "third.docx")
+    os.utime(stale, (now - 2 * 86400, now - 2 * 86400))
+    cache.evict()
+    assert sorted(os.listdir(cache.cache_dir)) == ["first.docx", "first.json"]
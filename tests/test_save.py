@@ -0,0 +1,74 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from excel_generator import ExcelGenerator, read_xlsx_rows
+from journal import EditJournal
+
+HEADERS = ("부서", "항목", "입금", "출금")
+
+
+def rows_of(generator):
+    return [(generator.row_id_at(index),) + tuple(map(str, generator.get_data_row(index)))
+            for index in range(1, generator.get_row_count() + 1)]
+
+
+def make_session(tmp_path):
+    journal = EditJournal(str(tmp_path / "session.journal"))
+    generator = ExcelGenerator(HEADERS)
+    generator.attach_journal(journal)
+    for index in range(6):
+        generator.add_data_row(f"부서{index % 3}", f"항목{index}", str(index * 100), "0")
+    generator.delete_row(2)
+    generator.sort_rows("입금", reverse=True)
+    return generator, journal
+
+
+def recover(journal):
+    journal.close()
+    recovered = ExcelGenerator(HEADERS)
+    EditJournal(journal.path).replay(recovered)
+    return recovered
+
+
+def test_save_without_later_edits_renumbers_and_compacts(tmp_path):
+    generator, journal = make_session(tmp_path)
+    file_path = str(tmp_path / "ledger.xlsx")
+    snapshot = generator.snapshot()
+    generator.write_file(file_path, snapshot)
+
+    assert generator.finish_save(file_path, snapshot) is False
+    # Row IDs now match the rows of the saved file
+    assert [generator.row_id_at(index) for index in range(1, 6)] == [1, 2, 3, 4, 5]
+    assert not journal.has_unsaved_edits()
+    assert rows_of(recover(journal)) == rows_of(generator)
+
+
+def test_edits_during_a_background_save_are_rebased(tmp_path):
+    generator, journal = make_session(tmp_path)
+    file_path = str(tmp_path / "ledger.xlsx")
+    before = rows_of(generator)
+    snapshot = generator.snapshot()
+
+    # Edits that reach the ledger while the snapshot is being written
+    saved_id_of_first = generator.row_id_at(1)
+    generator.update_cell(saved_id_of_first, "항목", "수정됨")
+    generator.delete_row(generator.row_id_at(3))
+    new_id = generator.add_data_row("신규", "추가", "7", "0")
+    generator.update_cell(new_id, "출금", "1")
+
+    generator.write_file(file_path, snapshot)
+    expected = [row[1:] for row in rows_of(generator)]
+    assert generator.finish_save(file_path, snapshot) is True
+
+    # The file holds the snapshot; the ledger and the journal hold the later edits on top of it
+    _, saved, _ = read_xlsx_rows(file_path)
+    saved_rows = [tuple(map(str, row)) for row in saved]
+    assert saved_rows == [row[1:] for row in before]
+    assert [row[1:] for row in rows_of(generator)] == expected
+    assert journal.has_unsaved_edits()
+
+    recovered = recover(journal)
+    assert rows_of(recovered) == rows_of(generator)
+    assert recovered.source_path == os.path.abspath(file_path)
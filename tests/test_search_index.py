@@ -0,0 +1,85 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from excel_generator import ExcelGenerator
+
+HEADERS = ("부서", "항목", "입금", "출금")
+
+
+def make_generator():
+    generator = ExcelGenerator(HEADERS)
+    generator.add_data_row("총무부", "비품", "1000", "0")
+    generator.add_data_row("총무부", "식대", "0", "500")
+    generator.add_data_row("영업부", "출장", "2000", "0")
+    return generator
+
+
+def test_edited_row_leaves_old_value():
+    generator = make_generator()
+    generator.update_cell(1, "부서", "인사부")
+    assert generator.search_rows("총") == [2]
+    assert generator.search_rows("인사") == [1]
+    assert generator.search_rows("ㅊㅁㅂ") == [2]
+
+
+def test_edit_back_and_forth():
+    generator = make_generator()
+    generator.update_cell(1, "부서", "인사부")
+    generator.update_cell(1, "부서", "총무부")
+    generator.update_cell(3, "부서", "총무부")
+    assert generator.search_rows("총무") == [1, 2, 3]
+    assert generator.search_rows("인사") == []
+    assert generator.search_rows("영업") == []
+    # A second search reads the cleaned postings
+    assert generator.search_rows("총무") == [1, 2, 3]
+
+
+def test_edit_after_search_and_delete():
+    generator = make_generator()
+    assert generator.search_rows("총무") == [1, 2]
+    generator.update_cell(2, "부서", "영업부")
+    generator.delete_row(3)
+    assert generator.search_rows("총무") == [1]
+    assert generator.search_rows("영업") == [2]
+
+
+def brute_force(generator, text, low, high):
+    ledger = generator.ledger
+    low = -2**63 if low is None else low
+    high = 2**63 - 1 if high is None else high
+    found = []
+    for position in ledger.order:
+        dept, entry, deposit, withdrawal = ledger.get_row(position + 1)
+        if text and text not in dept and text not in entry:
+            continue
+        if not ((deposit and low <= deposit <= high) or (withdrawal and low <= withdrawal <= high)):
+            continue
+        found.append(position + 1)
+    return found
+
+
+def test_amount_ranges_after_edits_deletes_and_sorts(monkeypatch):
+    import search_index
+    monkeypatch.setattr(search_index, "AMOUNT_PENDING_MIN", 8)
+    random.seed(5)
+    generator = ExcelGenerator(HEADERS)
+    for index in range(300):
+        generator.add_data_row(random.choice(["총무부", "영업부"]), "비품",
+                               str(random.randint(0, 50)), random.choice(["0", str(random.randint(1, 50))]))
+    queries = [("", 1000, 2000), ("", None, 500), ("", 4000, None), ("총무", 1000, 3000), ("", 0, 0)]
+    for step in range(200):
+        action = random.random()
+        row_ids = generator.search_rows()
+        if action < 0.4:
+            generator.update_cell(random.choice(row_ids), random.choice(["입금", "출금"]), str(random.randint(0, 50)))
+        elif action < 0.6:
+            generator.delete_row(random.choice(row_ids))
+        elif action < 0.65:
+            generator.sort_rows(random.choice(HEADERS), reverse=random.random() < 0.5)
+        else:
+            generator.add_data_row("영업부", "식대", str(random.randint(1, 50)), "0")
+        text, low, high = random.choice(queries)
+        assert generator.search_rows(text, low, high) == brute_force(generator, text, low, high)
@@ -0,0 +1,42 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from lxml import etree
+
+from word_report import BulkTableWriter
+
+ROWS = [
+    ["총무부", "비품", "1,000", "0"],
+    ["", "빈 칸", "", "12.50"],
+    [" 앞 공백", "뒤 공백 ", "  ", "0"],
+    ["탭\t포함", "줄\n바꿈", "캐리지\r리턴", "0"],
+    ["<&>", "\"따옴표\"", "'", "0"],
+]
+
+
+def make_table():
+    document = Document()
+    table = document.add_table(rows=1, cols=4)
+    for cell, header in zip(table.rows[0].cells, ("부서", "항목", "입금", "출금")):
+        cell.text = header
+    return table
+
+
+def table_xml(table):
+    return etree.tostring(table._tbl, encoding="unicode")
+
+
+def test_bulk_rows_match_python_docx():
+    expected = make_table()
+    for values in ROWS:
+        cells = expected.add_row().cells
+        for cell, text in zip(cells, values):
+            cell.text = text
+
+    actual = make_table()
+    BulkTableWriter(actual).add_rows(ROWS)
+
+    assert table_xml(actual) == table_xml(expected)
@@ -1,70 +1,434 @@
 import openpyxl
-from docx import Document
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+import copy
+import itertools
 import os
-import datetime
+import re
+import time
+
+from aggregation import LedgerAggregator, NUMPY_MIN_ROWS
+from amount import format_amount
+from file_utils import atomic_save
+from instrumentation import Instrumentation
+from report_template import get_report_template
+
+# Bump whenever the report layout changes, so cached reports are not reused across versions
+REPORT_FORMAT_VERSION = 3
+
+# How often (in rows) progress is reported and cancellation is checked while writing the table
+PROGRESS_INTERVAL = 500
+
+
+class ReportCancelled(Exception):
+    """Raised when report generation is cancelled before the document was saved."""
+
+
+class BulkTableWriter:
+    """
+    Appends data rows to a python-docx table by cloning a pre-built row template.
+
+    table.add_row().cells and cell.text build proxy objects and run XML lookups for every call.
+    Here one template <w:tr> is prepared once, and each data row is a deep copy of it with the
+    <w:t> texts filled in. The resulting XML is identical to what add_row()/cell.text produce.
+    """
+
+    # Characters python-docx turns into <w:tab/> / <w:br/>; rows containing them use the slow path
+    SPECIAL_CHARS = ('\t', '\n', '\r')
+    _T_TAG = qn('w:t')
+    _SPACE_ATTR = qn('xml:space')
+
+    def __init__(self, table):
+        self.table = table
+        self._tbl = table._tbl
+        self._column_count = len(table.columns)
+
+        # Build the template through python-docx itself so widths and structure match exactly
+        template_row = table.add_row()
+        for cell in template_row.cells:
+            cell.text = "x"
+        self._template = template_row._tr
+        self._tbl.remove(self._template)
+
+    def add_row(self, values):
+        """Appends one row. values must be strings, one per column."""
+        if len(values) != self._column_count or any(
+                char in value for value in values for char in self.SPECIAL_CHARS):
+            self._add_row_slow(values)
+            return
+
+        tr = copy.deepcopy(self._template)
+        for t, text in zip(tr.iter(self._T_TAG), values):
+            if not text:
+                # An empty cell.text leaves an empty run (<w:r/>)
+                t.getparent().remove(t)
+                continue
+            t.text = text
+            if len(text.strip()) < len(text):
+                t.set(self._SPACE_ATTR, 'preserve')
+        self._tbl.append(tr)
+
+    def add_rows(self, rows):
+        """Appends every row from an iterable of string sequences."""
+        for values in rows:
+            self.add_row(values)
+
+    def _add_row_slow(self, values):
+        row_cells = self.table.add_row().cells
+        for i, text in enumerate(values):
+            row_cells[i].text = text
+
+
+def add_hyperlink(paragraph, target, text):
+    """Appends a run linking to target (a URL or a path relative to the document) to the paragraph."""
+    r_id = paragraph.part.relate_to(target, RT.HYPERLINK, is_external=True)
+    hyperlink = OxmlElement('w:hyperlink')
+    hyperlink.set(qn('r:id'), r_id)
+
+    run = OxmlElement('w:r')
+    run_properties = OxmlElement('w:rPr')
+    # The default template has no "Hyperlink" character style, so the usual look is set directly
+    color = OxmlElement('w:color')
+    color.set(qn('w:val'), '0563C1')
+    underline = OxmlElement('w:u')
+    underline.set(qn('w:val'), 'single')
+    run_properties.append(color)
+    run_properties.append(underline)
+    run.append(run_properties)
+    text_element = OxmlElement('w:t')
+    text_element.text = text
+    run.append(text_element)
+    hyperlink.append(run)
+    paragraph._p.append(hyperlink)
+
 
 class WordReportGenerator:
     """Reads data from an Excel file and generates a Word report (.docx)."""
 
-    def generate_report(self, excel_file_path):
-        """Reads data from the Excel path and saves the Word report."""
+    def __init__(self, cache=None, instrumentation=None, template=None):
+        # Optional report_cache.ReportCache; without one every call regenerates the report
+        self.cache = cache
+        # Phase timings (load, header_read, row_iteration, table_build, summary, save); silent by default
+        self.instrumentation = instrumentation or Instrumentation()
+        # report_template.ReportTemplate the documents are cloned from (parsed once per process)
+        self.template = template or get_report_template()
+
+    def generate_report(self, excel_file_path, progress_callback=None, cancel_event=None,
+                        include_summary=True, force_rebuild=False, rows_per_part=None):
+        """
+        Reads data from the Excel path and saves the Word report.
+
+        progress_callback(phase, done, total) is called with phase 'read', 'write' or 'save'.
+        If cancel_event (a threading.Event) is set, ReportCancelled is raised and no .docx is left behind.
+        include_summary adds per-부서 / per-항목 / overall totals before the detail table.
+        With a cache, an unchanged workbook returns the existing report unless force_rebuild is set.
+
+        rows_per_part splits the detail table into part files of at most that many rows
+        (<name>_Report_part1.docx, ...); the returned <name>_Report.docx then only holds the summary
+        and links to the parts (see _build_report_parts). Split reports are not cached.
+        """
         
         if not os.path.exists(excel_file_path):
             raise FileNotFoundError(f"File not found: {excel_file_path}")
-        print(f"file found: {excel_file_path}")
+        instrumentation = self.instrumentation
+
+        def report_progress(phase, done, total):
+            if progress_callback:
+                progress_callback(phase, done, total)
+
+        def check_cancelled():
+            if cancel_event is not None and cancel_event.is_set():
+                raise ReportCancelled("Report generation was cancelled.")
 
         # The output file will be in the same directory as the input file
         base_dir = os.path.dirname(excel_file_path)
         base_name = os.path.basename(excel_file_path)
         doc_name = os.path.join(base_dir, base_name.replace('.xlsx', '_Report.docx'))
 
-        print("before workebook")
+        cache_key = None
+        if self.cache is not None and not rows_per_part:
+            with instrumentation.span('cache_lookup'):
+                cache_key = self.cache.make_key(excel_file_path, REPORT_FORMAT_VERSION,
+                                                # The file name is part of the report heading
+                                                {"include_summary": include_summary, "source_name": base_name,
+                                                 "template": self.template.cache_token})
+                cached = not force_rebuild and self.cache.lookup(cache_key, doc_name)
+            if force_rebuild:
+                self.cache.misses += 1
+            elif cached:
+                return doc_name
 
-        workbook = openpyxl.load_workbook(excel_file_path)
-        print("after workbook")
-        sheet = workbook.active
-        print("active")
-        
-        headers = [cell.value for cell in sheet[1]]
-        data_rows = list(sheet.iter_rows(min_row=2, values_only=True)) 
+        headers, data_rows, total_rows = self.open_excel_rows(excel_file_path, instrumentation)
+        report_progress('read', 0, total_rows)
+
+        try:
+            check_cancelled()
+            if rows_per_part:
+                self._build_report_parts(base_name, doc_name, headers, data_rows, total_rows, rows_per_part,
+                                         report_progress, check_cancelled, include_summary, instrumentation)
+            else:
+                self._build_report(base_name, doc_name, headers, data_rows, total_rows,
+                                   report_progress, check_cancelled, include_summary, instrumentation)
+        finally:
+            # Closes the read-only workbook even if the table was not fully written
+            data_rows.close()
+
+        if cache_key is not None:
+            self.cache.store(cache_key, doc_name)
+        # Return the save path for the GUI to display
+        return doc_name
 
-        if not data_rows:
+    def generate_report_from_rows(self, source_name, doc_name, headers, data_rows, total_rows=0,
+                                  include_summary=True):
+        """
+        Builds and saves a report from rows that were already read (e.g. one department's partition,
+        see department_reports.py). source_name is shown in the heading. Returns doc_name.
+        """
+        self._build_report(source_name, doc_name, headers, data_rows, total_rows,
+                           lambda phase, done, total: None, lambda: None, include_summary)
+        return doc_name
+
+    def open_excel_rows(self, excel_file_path, instrumentation=None):
+        """
+        Opens the workbook in read-only (streaming) mode.
+        Returns (headers, data row generator, estimated data row count). Rows are never buffered,
+        so memory stays flat regardless of the ledger size.
+        """
+        instrumentation = instrumentation or self.instrumentation
+        with instrumentation.span('load'):
+            workbook = openpyxl.load_workbook(excel_file_path, read_only=True, data_only=True)
+            sheet = workbook.active
+            rows = sheet.iter_rows(values_only=True)
+
+        with instrumentation.span('header_read'):
+            header_row = next(rows, None)
+            # Peek at the first data row so the "empty file" check does not buffer anything
+            first_row = next(rows, None)
+        if header_row is None or first_row is None:
+            workbook.close()
             raise ValueError("The Excel file is empty or only contains headers.")
 
-        # Create the Word Document
-        document = Document()
-        print("Document()")
-        document.add_heading(f'Report Generated from: {base_name}', 0)
-        print("add_heading")
-        document.add_paragraph(f"Report Date: {datetime.datetime.now().strftime('%Y-%m-%d')}")
-        print("add_paragraph")
-        document.add_heading('Data Summary Table', level=1)
+        # max_row comes from the sheet's dimension record and is only an estimate in read-only mode
+        total_rows = max((sheet.max_row or 0) - 1, 0)
 
-        print("document")
+        def stream_rows():
+            try:
+                yield first_row
+                yield from rows
+            finally:
+                workbook.close()
 
-        # Create a Table in Word
-        table = document.add_table(rows=1, cols=len(headers))
-        table.style = 'Table Grid'
+        return list(header_row), stream_rows(), total_rows
 
-        print("add table")
+    def _build_report(self, base_name, doc_name, headers, data_rows, total_rows,
+                      report_progress, check_cancelled, include_summary=True, instrumentation=None):
+        """Builds the Word document from the streamed rows and saves it atomically."""
+        instrumentation = instrumentation or self.instrumentation
 
-        # Set the table headers
-        header_cells = table.rows[0].cells
-        for i, header in enumerate(headers):
-            header_cells[i].text = str(header)
-        
-        print("header")
-            
-        # Populate the table with Excel data
-        for row_data in data_rows:
-            row_cells = table.add_row().cells
-            for i, cell_value in enumerate(row_data):
-                row_cells[i].text = str(cell_value)
+        with instrumentation.span('document_setup'):
+            document, summary_anchor, table_writer = self._new_detail_document(base_name, headers)
+            # Totals are computed in the same pass over the rows
+            aggregator = None
+            if include_summary:
+                aggregator = LedgerAggregator(headers, use_numpy=total_rows >= NUMPY_MIN_ROWS)
+
+        # Reading rows and building the table are interleaved, so both spans accumulate their own time
+        read_span = instrumentation.begin('row_iteration', accumulate=True)
+        build_span = instrumentation.begin('table_build', accumulate=True)
+        clock = time.perf_counter
+        rows = iter(data_rows)
+        row_number = 0
+        while True:
+            read_start = clock()
+            row_data = next(rows, None)
+            build_start = clock()
+            read_span.add_time(build_start - read_start)
+            if row_data is None:
+                break
+
+            row_number += 1
+            table_writer.add_row([str(cell_value) for cell_value in row_data])
+            if aggregator:
+                aggregator.add_row(row_data)
+            build_span.add_time(clock() - build_start)
+
+            if row_number % PROGRESS_INTERVAL == 0:
+                report_progress('write', row_number, max(total_rows, row_number))
+                check_cancelled()
         
-        print("data writing")
+        total_rows = row_number
+        instrumentation.end(read_span, rows=total_rows)
+        instrumentation.end(build_span, rows=total_rows)
+        report_progress('write', total_rows, total_rows)
+        check_cancelled()
+
+        if aggregator:
+            with instrumentation.span('summary'):
+                self.add_summary_tables(document, aggregator.finish(), headers, before=summary_anchor)
         
-        # Save the Word File
-        document.save(doc_name)
-        print("save")
-        # Return the save path for the GUI to display
-        return doc_name
\ No newline at end of file
+        # Save the Word File to a temporary file first, so a cancelled or failed save
+        # never leaves a half-written report behind
+        report_progress('save', total_rows, total_rows)
+        with instrumentation.span('save'):
+            atomic_save(doc_name, document.save, before_replace=check_cancelled)
+
+    def _new_detail_document(self, title_name, headers):
+        """
+        Clones a report document with the heading, date, detail heading and the table header row
+        from the cached skeleton (see report_template.py).
+        Returns (document, summary anchor, BulkTableWriter for the data rows).
+        """
+        document, summary_anchor, table = self.template.new_report(title_name, headers)
+
+        # Populate the table with Excel data (rows are cloned from a template, see BulkTableWriter)
+        return document, summary_anchor, BulkTableWriter(table)
+
+    def _build_report_parts(self, base_name, doc_name, headers, data_rows, total_rows, rows_per_part,
+                            report_progress, check_cancelled, include_summary=True, instrumentation=None):
+        """
+        Streams the rows into successive part documents of at most rows_per_part rows each, every one
+        with the heading and table header repeated. Each part is saved and dropped before the next one is
+        started, so memory is bounded by the part size rather than the ledger size. Finally doc_name is
+        written as a small master document: the summary (totals over all parts) and a link to every part.
+        Part files left over from an earlier, longer report of the same name are removed once the master
+        is saved.
+        """
+        instrumentation = instrumentation or self.instrumentation
+        aggregator = None
+        if include_summary:
+            aggregator = LedgerAggregator(headers, use_numpy=total_rows >= NUMPY_MIN_ROWS)
+
+        read_span = instrumentation.begin('row_iteration', accumulate=True)
+        build_span = instrumentation.begin('table_build', accumulate=True)
+        save_span = instrumentation.begin('save', accumulate=True)
+        clock = time.perf_counter
+        rows = iter(data_rows)
+        row_number = 0
+        parts = []  # (part path, first row number, last row number)
+        try:
+            while True:
+                part_rows = itertools.islice(rows, rows_per_part)
+                read_start = clock()
+                row_data = next(part_rows, None)
+                read_span.add_time(clock() - read_start)
+                if row_data is None:
+                    break
+
+                part_number = len(parts) + 1
+                part_path = f"{os.path.splitext(doc_name)[0]}_part{part_number}.docx"
+                first_row = row_number + 1
+                build_start = clock()
+                document, _, table_writer = self._new_detail_document(f"{base_name} (part {part_number})", headers)
+                build_span.add_time(clock() - build_start)
+
+                while row_data is not None:
+                    build_start = clock()
+                    row_number += 1
+                    table_writer.add_row([str(cell_value) for cell_value in row_data])
+                    if aggregator:
+                        aggregator.add_row(row_data)
+                    read_start = clock()
+                    build_span.add_time(read_start - build_start)
+
+                    if row_number % PROGRESS_INTERVAL == 0:
+                        report_progress('write', row_number, max(total_rows, row_number))
+                        check_cancelled()
+                    row_data = next(part_rows, None)
+                    read_span.add_time(clock() - read_start)
+
+                save_start = clock()
+                atomic_save(part_path, document.save, before_replace=check_cancelled)
+                save_span.add_time(clock() - save_start)
+                parts.append((part_path, first_row, row_number))
+                del document, table_writer
+
+            instrumentation.end(read_span, rows=row_number)
+            instrumentation.end(build_span, rows=row_number)
+            report_progress('write', row_number, row_number)
+            check_cancelled()
+
+            with instrumentation.span('summary'):
+                # Same template as the parts; the part list takes the place of the detail table
+                document, parts_anchor = self.template.new_master(base_name, headers)
+                parts_heading = self.template.add_heading(document, 'Report Parts', level=1)
+                parts_anchor._p.addprevious(parts_heading._p)
+                for part_path, first_row, last_row in parts:
+                    paragraph = document.add_paragraph()
+                    add_hyperlink(paragraph, os.path.basename(part_path), os.path.basename(part_path))
+                    paragraph.add_run(f"  (rows {first_row:,}-{last_row:,})")
+                    parts_anchor._p.addprevious(paragraph._p)
+                parts_anchor._p.getparent().remove(parts_anchor._p)
+                if aggregator:
+                    self.add_summary_tables(document, aggregator.finish(), headers, before=parts_heading)
+
+            report_progress('save', row_number, row_number)
+            save_start = clock()
+            atomic_save(doc_name, document.save, before_replace=check_cancelled)
+            save_span.add_time(clock() - save_start)
+            instrumentation.end(save_span)
+            self._remove_stale_parts(doc_name, [part_path for part_path, _, _ in parts])
+        except BaseException:
+            # A cancelled or failed report leaves no part files behind
+            for part_path, _, _ in parts:
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+            raise
+
+    @staticmethod
+    def _remove_stale_parts(doc_name, current_parts):
+        """Deletes <stem>_part<N>.docx files next to doc_name that are not among current_parts."""
+        directory, stem = os.path.split(os.path.splitext(doc_name)[0])
+        directory = directory or '.'
+        part_name = re.compile(re.escape(stem) + r'_part\d+\.docx')
+        current = {os.path.normcase(os.path.abspath(path)) for path in current_parts}
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if part_name.fullmatch(name) and os.path.normcase(os.path.abspath(path)) not in current:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass  # e.g. still open in Word; the master no longer links to it
+
+    def add_summary_tables(self, document, aggregator, headers, before):
+        """
+        Adds the totals per 부서, per 항목 and overall, placed in front of the paragraph or table 'before'
+        (the detail table heading, or the detail table itself), so the summary is read first.
+        """
+        dept_header = str(headers[aggregator.dept_index])
+        entry_header = str(headers[aggregator.entry_index])
+        deposit_header = str(headers[aggregator.deposit_index])
+        withdrawal_header = str(headers[aggregator.withdrawal_index])
+
+        # The summary is appended at the end of the body first and then moved into place
+        new_elements = []
+
+        def add_table(rows, column_headers):
+            table = self.template.add_table(document, rows=1, cols=len(column_headers))
+            for cell, text in zip(table.rows[0].cells, column_headers):
+                cell.text = text
+            for values in rows:
+                for cell, text in zip(table.add_row().cells, values):
+                    cell.text = text
+            new_elements.append(table._tbl)
+
+        def group_rows(groups):
+            for key in sorted(groups, key=lambda key: "" if key is None else str(key)):
+                totals = groups[key]
+                label = "(blank)" if key is None or str(key).strip() == "" else str(key)
+                yield [label, f"{totals.count:,}", format_amount(totals.deposit, grouping=True),
+                       format_amount(totals.withdrawal, grouping=True), format_amount(totals.net, grouping=True)]
+
+        for group_header, groups in ((dept_header, aggregator.by_dept), (entry_header, aggregator.by_entry)):
+            new_elements.append(self.template.add_heading(document, f'Totals by {group_header}', level=1)._p)
+            add_table(group_rows(groups),
+                      [group_header, "Count", deposit_header, withdrawal_header, "Net"])
+
+        overall = aggregator.overall
+        new_elements.append(self.template.add_heading(document, 'Overall Totals', level=1)._p)
+        add_table([[f"{overall.count:,}", format_amount(overall.deposit, grouping=True),
+                    format_amount(overall.withdrawal, grouping=True), format_amount(overall.net, grouping=True)]],
+                  ["Rows", deposit_header, withdrawal_header, "Net Balance"])
+
+        for element in new_elements:
+            before._element.addprevious(element)